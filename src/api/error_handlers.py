@@ -1,26 +1,25 @@
 """Error handlers for API."""
 
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import Request, Response, status
 from fastapi.exceptions import RequestValidationError
 
-from src.core.exceptions import (
-    PaymentSystemException,
-    InsufficientFundsError,
-    InvalidAccountError,
-    InvalidAmountError,
-    AccountSuspendedError,
-    TransactionLimitExceededError,
-    DuplicateTransactionError,
-    CurrencyMismatchError,
-    RateLimitExceededError,
-    AuthenticationError,
-    PermissionDeniedError
-)
+from src.api.responses import ORJSONResponse
+from src.core.exceptions import PaymentSystemException
 from src.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Error body template. "detail" matches FastAPI's HTTPException bodies and
+# the endpoints' ErrorResponse model; the error name is a class name so
+# needs no escaping
+_ERR_TMPL = b'{"detail":%s,"error":"%s","path":%s}'
+
+
+def _error_body(error: str, message: str, path: str) -> bytes:
+    """Render an error response body without building a dict."""
+    return _ERR_TMPL % (orjson.dumps(message), error.encode(), orjson.dumps(path))
+
 
 def register_error_handlers(app):
     """Register error handlers with FastAPI app."""
@@ -28,77 +27,58 @@ def register_error_handlers(app):
     @app.exception_handler(PaymentSystemException)
     async def payment_system_exception_handler(request: Request, exc: PaymentSystemException):
         """Handle payment system exceptions."""
-        status_code = status.HTTP_400_BAD_REQUEST
-        
-        if isinstance(exc, InsufficientFundsError):
-            status_code = status.HTTP_400_BAD_REQUEST
-        elif isinstance(exc, InvalidAccountError):
-            status_code = status.HTTP_404_NOT_FOUND
-        elif isinstance(exc, (InvalidAmountError, CurrencyMismatchError)):
-            status_code = status.HTTP_400_BAD_REQUEST
-        elif isinstance(exc, AccountSuspendedError):
-            status_code = status.HTTP_403_FORBIDDEN
-        elif isinstance(exc, DuplicateTransactionError):
-            status_code = status.HTTP_409_CONFLICT
-        elif isinstance(exc, RateLimitExceededError):
-            status_code = status.HTTP_429_TOO_MANY_REQUESTS
-        elif isinstance(exc, AuthenticationError):
-            status_code = status.HTTP_401_UNAUTHORIZED
-        elif isinstance(exc, PermissionDeniedError):
-            status_code = status.HTTP_403_FORBIDDEN
+        path = request.scope["path"]
+        status_code = exc.http_status
         
         logger.warning(
             "Payment system exception",
             error_type=type(exc).__name__,
             error_message=str(exc),
-            path=request.url.path
+            path=path
         )
         
-        return JSONResponse(
+        return Response(
+            content=_error_body(type(exc).__name__, str(exc), path),
             status_code=status_code,
-            content={
-                "error": type(exc).__name__,
-                "message": str(exc),
-                "path": request.url.path
-            }
+            media_type="application/json"
         )
     
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         """Handle validation errors."""
+        path = request.scope["path"]
+        errors = exc.errors()
         logger.warning(
             "Validation error",
-            errors=exc.errors(),
-            path=request.url.path
+            errors=errors,
+            path=path
         )
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             content={
                 "error": "ValidationError",
                 "message": "Request validation failed",
-                "details": exc.errors(),
-                "path": request.url.path
+                "details": errors,
+                "path": path
             }
         )
     
     @app.exception_handler(Exception)
     async def general_exception_handler(request: Request, exc: Exception):
         """Handle unexpected exceptions."""
+        path = request.scope["path"]
         logger.error(
             "Unexpected error",
             error_type=type(exc).__name__,
             error_message=str(exc),
-            path=request.url.path,
+            path=path,
             exc_info=True
         )
         
-        return JSONResponse(
+        return Response(
+            content=_error_body("InternalServerError", "An unexpected error occurred", path),
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={
-                "error": "InternalServerError",
-                "message": "An unexpected error occurred",
-                "path": request.url.path
-            }
+            media_type="application/json"
         )
 
@@ -1,88 +1,274 @@
 """API middleware."""
 
-from fastapi import Request, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+import random
+import secrets
 import time
+from collections import deque
+from typing import Collection, Deque, Dict, List, Optional
 
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api.responses import ORJSONResponse
 from src.core.config import settings
 from src.core.logging import get_logger
-from src.services.cache import cache_service
-from src.core.exceptions import RateLimitExceededError
+from src.services.cache import async_cache_service
+from src.utils.metrics import metric_aggregator, track_api_request
 
 logger = get_logger(__name__)
 
+# Paths exempt from rate limiting
+_SKIP_PATHS = frozenset({"/health", "/docs", "/redoc", "/openapi.json"})
+
+
+def get_client_ip(scope: Scope, trusted_proxies: Collection[str]) -> str:
+    """
+    Resolve the real client IP for a request.
+    
+    Forwarding headers are only honoured when the direct peer is a trusted
+    proxy; otherwise any client could spoof them. CF-Connecting-IP wins if
+    present. For X-Forwarded-For the rightmost untrusted hop is used, since
+    everything to its left was supplied by the client.
+    
+    Args:
+        scope: ASGI connection scope
+        trusted_proxies: Peer IPs whose forwarding headers are trusted
+    
+    Returns:
+        Client IP address, or "unknown"
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    if peer not in trusted_proxies:
+        return peer
+    
+    forwarded_for = None
+    for name, value in scope["headers"]:
+        if name == b"cf-connecting-ip":
+            return value.decode("latin-1").strip()
+        if name == b"x-forwarded-for":
+            forwarded_for = value
+    
+    if forwarded_for is None:
+        return peer
+    
+    for hop in reversed(forwarded_for.decode("latin-1").split(",")):
+        hop = hop.strip()
+        if hop and hop not in trusted_proxies:
+            return hop
+    return peer
+
+
+class AdmissionFilter:
+    """
+    In-process frequency filter for rate-limit counters.
+    
+    Tracks per-minute hit counts for each client over the last few minutes.
+    Only clients seen more than `threshold` times are "hot" and get their own
+    Redis counters; cold clients (scanners, one-off callers) share a single
+    bucket so they don't flood the keyspace or cost a per-client write.
+    """
+    
+    def __init__(self, threshold: int, window_minutes: int = 5, max_clients: int = 100_000):
+        """Initialize admission filter."""
+        self.threshold = threshold
+        self.window_minutes = window_minutes
+        self.max_clients = max_clients
+        self._buckets: Dict[str, Deque[List[int]]] = {}
+    
+    def record(self, client_id: str, now: Optional[float] = None) -> bool:
+        """
+        Record a hit for a client.
+        
+        Returns:
+            True if the client is hot (above threshold), False if cold
+        """
+        minute = int((time.time() if now is None else now) // 60)
+        oldest = minute - self.window_minutes + 1
+        
+        buckets = self._buckets.get(client_id)
+        if buckets is None:
+            if len(self._buckets) >= self.max_clients:
+                self._evict(oldest)
+            buckets = self._buckets[client_id] = deque()
+        
+        while buckets and buckets[0][0] < oldest:
+            buckets.popleft()
+        if buckets and buckets[-1][0] == minute:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([minute, 1])
+        
+        return sum(count for _, count in buckets) > self.threshold
+    
+    def _evict(self, oldest: int) -> None:
+        """Drop clients with no hits in the window, or everyone if still full."""
+        stale = [
+            client_id for client_id, buckets in self._buckets.items()
+            if not buckets or buckets[-1][0] < oldest
+        ]
+        for client_id in stale:
+            del self._buckets[client_id]
+        if len(self._buckets) >= self.max_clients:
+            self._buckets.clear()
+
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware."""
+class RateLimitMiddleware:
+    """Rate limiting middleware (pure ASGI)."""
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        """Initialize middleware."""
+        self.app = app
+        self.trusted_proxies = frozenset(settings.TRUSTED_PROXIES)
+        self.admission = (
+            AdmissionFilter(settings.RATE_LIMIT_ADMISSION_THRESHOLD)
+            if settings.RATE_LIMIT_ADMISSION_THRESHOLD > 0
+            else None
+        )
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Check rate limit before processing request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
+        if scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        # Get client identifier (IP address or user ID)
-        client_id = request.client.host if request.client else "unknown"
+        # Get client identifier (real client IP behind trusted proxies)
+        client_id = get_client_ip(scope, self.trusted_proxies)
+        # Share the resolved IP with handlers (request.state.client_ip)
+        scope.setdefault("state", {})["client_ip"] = client_id
         
         # Check rate limit
-        if not self._check_rate_limit(client_id):
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded"
+        if not await self._check_rate_limit(client_id):
+            response = ORJSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded"}
             )
+            await response(scope, receive, send)
+            return
         
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
     
-    def _check_rate_limit(self, client_id: str) -> bool:
-        """Check if client has exceeded rate limit."""
-        minute_key = f"rate_limit:minute:{client_id}"
-        hour_key = f"rate_limit:hour:{client_id}"
+    async def _check_rate_limit(self, client_id: str) -> bool:
+        """Check if client has exceeded rate limit (sliding window)."""
+        if self.admission is not None and not self.admission.record(client_id):
+            # Cold clients are counted against a shared bucket
+            windows = [
+                ("rate_limit:sliding:minute:cold", 60, settings.RATE_LIMIT_COLD_PER_MINUTE),
+                ("rate_limit:sliding:hour:cold", 3600, settings.RATE_LIMIT_COLD_PER_HOUR),
+            ]
+        else:
+            windows = [
+                (f"rate_limit:sliding:minute:{client_id}", 60, settings.RATE_LIMIT_PER_MINUTE),
+                (f"rate_limit:sliding:hour:{client_id}", 3600, settings.RATE_LIMIT_PER_HOUR),
+            ]
         
-        # Check minute limit
-        minute_count = cache_service.get(minute_key)
-        if minute_count and int(minute_count) >= settings.RATE_LIMIT_PER_MINUTE:
-            return False
-        
-        # Check hour limit
-        hour_count = cache_service.get(hour_key)
-        if hour_count and int(hour_count) >= settings.RATE_LIMIT_PER_HOUR:
-            return False
+        allowed = await async_cache_service.sliding_window_hit(
+            windows,
+            member=secrets.token_hex(8)
+        )
         
-        # Increment counters
-        cache_service.set(minute_key, str(int(minute_count or 0) + 1), ttl=60)
-        cache_service.set(hour_key, str(int(hour_count or 0) + 1), ttl=3600)
+        # Fail open if the cache is unavailable
+        if allowed is None:
+            return True
         
-        return True
+        return allowed
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Request logging middleware."""
+class LoggingMiddleware:
+    """
+    Request logging middleware (pure ASGI).
     
-    async def dispatch(self, request: Request, call_next):
+    Emits one record per completed request. Errors (status >= 400) and slow
+    requests are always logged; other requests are sampled at LOG_SAMPLE_RATE.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        """Initialize middleware."""
+        self.app = app
+        self.sample_rate = settings.LOG_SAMPLE_RATE
+        self.slow_seconds = settings.LOG_SLOW_REQUEST_MS / 1000
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Log request and response."""
-        start_time = time.time()
-        
-        # Log request
-        logger.info(
-            "Request started",
-            method=request.method,
-            path=request.url.path,
-            client_ip=request.client.host if request.client else None
-        )
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        response = await call_next(request)
+        start_time = time.perf_counter()
+        status_code = 500
         
-        # Log response
-        process_time = time.time() - start_time
-        logger.info(
-            "Request completed",
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            process_time=process_time
-        )
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
         
-        return response
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            process_time = time.perf_counter() - start_time
+            if self._should_log(status_code, process_time):
+                client = scope.get("client")
+                logger.info(
+                    "Request completed",
+                    method=scope["method"],
+                    path=scope["path"],
+                    status_code=status_code,
+                    process_time=process_time,
+                    client_ip=client[0] if client else None
+                )
+    
+    def _should_log(self, status_code: int, process_time: float) -> bool:
+        """Decide whether a completed request is logged."""
+        return (
+            status_code >= 400
+            or process_time > self.slow_seconds
+            or random.random() < self.sample_rate
+        )
+
 
+class MetricsMiddleware:
+    """
+    Request metrics middleware (pure ASGI).
+    
+    Records each request's count and duration, labelled by route template
+    rather than raw path, and buffers the request's counter increments so
+    they're applied to Prometheus once, after the response.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        """Initialize middleware."""
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Track request metrics."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        token = metric_aggregator.start()
+        start_time = time.perf_counter()
+        status_code = 500
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            track_api_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - start_time
+            )
+            metric_aggregator.flush(token)
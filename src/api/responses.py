@@ -0,0 +1,23 @@
+"""API response classes."""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from src.utils.json_serialization import json_dumps
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    
+    Unlike FastAPI's ORJSONResponse this falls back to str() for types orjson
+    doesn't handle natively (e.g. Decimal), and serializes datetimes in C as
+    UTC ISO 8601 - pass datetime objects rather than calling isoformat().
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        """Serialize content to JSON bytes."""
+        return json_dumps(content)
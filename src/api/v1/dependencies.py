@@ -1,37 +1,170 @@
 """API dependencies."""
 
+import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import jws
+from jose.exceptions import JWSError
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.db.database import get_db
+from src.services.payment_service import PaymentService
 
-# For now, simplified authentication
-# In production, implement proper JWT authentication
 security = HTTPBearer()
 
 
+class TokenCache:
+    """
+    Bounded LRU cache of verified tokens with frequency-based admission.
+    
+    A token is only admitted to the LRU on its second sighting (a TinyLFU
+    style "doorkeeper"), so floods of one-shot tokens can't evict the hot
+    session tokens that make up most traffic.
+    """
+    
+    def __init__(self, maxsize: int):
+        """Initialize token cache."""
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, Tuple[int, float]]" = OrderedDict()
+        self._doorkeeper: set = set()
+        self._lock = threading.Lock()
+    
+    def get(self, key: bytes) -> Optional[Tuple[int, float]]:
+        """Get (user_id, exp) for a token digest if cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key: bytes, user_id: int, exp: float) -> None:
+        """Cache a verified token, subject to admission."""
+        with self._lock:
+            if key not in self._doorkeeper:
+                # First sighting - remember it, but don't cache yet
+                if len(self._doorkeeper) >= self.maxsize:
+                    self._doorkeeper.clear()
+                self._doorkeeper.add(key)
+                return
+            
+            self._entries[key] = (user_id, exp)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def discard(self, key: bytes) -> None:
+        """Remove a token from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+_token_cache = TokenCache(settings.AUTH_CACHE_SIZE)
+
+
+def _unauthorized(detail: str = "Invalid authentication token") -> HTTPException:
+    """Build a 401 error."""
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail
+    )
+
+
+def _peek_claims(token: str) -> Dict[str, Any]:
+    """
+    Decode JWT claims without verifying the signature.
+    
+    Only base64 and JSON decoding - no crypto. The result must not be
+    trusted until the signature has been verified.
+    """
+    try:
+        _, payload, _ = token.split(".")
+        claims = orjson.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError:
+        raise _unauthorized()
+    
+    if not isinstance(claims, dict):
+        raise _unauthorized()
+    return claims
+
+
+def _verify_signature(token: str, key: str) -> None:
+    """Verify the JWT signature."""
+    try:
+        jws.verify(token, key, algorithms=[settings.ALGORITHM])
+    except JWSError:
+        raise _unauthorized()
+
+
+def _verify_token(token: str) -> Tuple[int, float]:
+    """
+    Verify token and return (user_id, expiry timestamp).
+    
+    Cheap claim checks run before the signature check, so expired or
+    malformed tokens are rejected without doing any crypto.
+    """
+    if settings.DEBUG:
+        # For development, accept any token and return user_id=1
+        return 1, time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    
+    claims = _peek_claims(token)
+    
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= time.time():
+        raise _unauthorized("Token expired")
+    
+    try:
+        user_id = int(claims["sub"])
+    except (KeyError, TypeError, ValueError):
+        raise _unauthorized()
+    
+    _verify_signature(token, settings.SECRET_KEY)
+    
+    return user_id, float(exp)
+
+
 def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> int:
     """
     Get current user ID from token.
     
-    TODO: Implement proper JWT verification
-    For now, returns a mock user ID for development.
+    Verified tokens are cached by digest until they expire, so repeat
+    requests skip verification.
     """
-    # Mock implementation - replace with actual JWT verification
     token = credentials.credentials
     
-    # In production:
-    # 1. Verify JWT token
-    # 2. Extract user_id from payload
-    # 3. Return user_id
-    
-    # For development, accept any token and return user_id=1
     if not token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required"
         )
     
-    # Mock user ID
-    return 1
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        user_id, exp = cached
+        if exp > time.time():
+            return user_id
+        _token_cache.discard(cache_key)
+    
+    user_id, exp = _verify_token(token)
+    _token_cache.put(cache_key, user_id, exp)
+    return user_id
 
+
+def get_payment_service(db: Session = Depends(get_db)) -> PaymentService:
+    """
+    Get a PaymentService bound to the request's database session.
+    
+    FastAPI caches dependencies per request, so every consumer within a
+    request shares one instance (and one session).
+    """
+    return PaymentService(db)
@@ -1,14 +1,16 @@
 """Account endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Union
 
+from src.api.responses import ORJSONResponse
 from src.db.database import get_db
+from src.db.models import Account
 from src.services.account_service import AccountService
 from src.core.money import Money, parse_money
-from src.core.exceptions import InvalidAccountError, AccountSuspendedError
 from src.api.v1.dependencies import get_current_user_id
 from src.core.logging import get_logger
 
@@ -89,9 +91,21 @@ class ErrorResponse(BaseModel):
     detail: str = Field(..., description="Error message")
 
 
+def _account_payload(account: Union[Account, Row]) -> dict:
+    """Build AccountResponse-shaped payload from an Account or row, without model validation."""
+    return {
+        "account_id": account.account_id,
+        "user_id": account.user_id,
+        "currency": account.currency,
+        "balance": str(account.balance),
+        "status": account.status.value,
+        "created_at": account.created_at
+    }
+
+
 @router.post(
     "", 
-    response_model=AccountResponse, 
+    response_class=ORJSONResponse, 
     status_code=status.HTTP_201_CREATED,
     summary="Create Account",
     description="""
@@ -110,7 +124,7 @@ Create a new account for the authenticated user.
         400: {"description": "Invalid request data", "model": ErrorResponse}
     }
 )
-async def create_account(
+def create_account(
     request: AccountCreateRequest,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
@@ -121,39 +135,24 @@ async def create_account(
     The account will be created with ACTIVE status and can immediately
     receive deposits or be used for transfers.
     """
-    try:
-        initial_balance = None
-        if request.initial_balance:
-            initial_balance = parse_money(request.initial_balance, request.currency)
-        
-        account_service = AccountService(db)
-        account = account_service.create_account(
-            user_id=user_id,
-            currency=request.currency,
-            initial_balance=initial_balance
-        )
-        db.commit()
-        
-        return AccountResponse(
-            account_id=account.account_id,
-            user_id=account.user_id,
-            currency=account.currency,
-            balance=str(account.balance),
-            status=account.status.value,
-            created_at=account.created_at.isoformat()
-        )
-    except Exception as e:
-        db.rollback()
-        logger.error("Account creation failed", error=str(e), user_id=user_id)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
+    initial_balance = None
+    if request.initial_balance:
+        initial_balance = parse_money(request.initial_balance, request.currency)
+    
+    account_service = AccountService(db)
+    account = account_service.create_account(
+        user_id=user_id,
+        currency=request.currency,
+        initial_balance=initial_balance
+    )
+    account_service.commit()
+    
+    return ORJSONResponse(_account_payload(account), status_code=status.HTTP_201_CREATED)
 
 
 @router.get(
     "/{account_id}", 
-    response_model=AccountResponse,
+    response_class=ORJSONResponse,
     summary="Get Account Details",
     description="Retrieve detailed information about a specific account.",
     responses={
@@ -162,7 +161,7 @@ async def create_account(
         404: {"description": "Account not found", "model": ErrorResponse}
     }
 )
-async def get_account(
+def get_account(
     account_id: int,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
@@ -172,35 +171,22 @@ async def get_account(
     
     Only the account owner can view account details.
     """
-    try:
-        account_service = AccountService(db)
-        account = account_service.get_account(account_id)
-        
-        # Verify user owns account
-        if account.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
-        
-        return AccountResponse(
-            account_id=account.account_id,
-            user_id=account.user_id,
-            currency=account.currency,
-            balance=str(account.balance),
-            status=account.status.value,
-            created_at=account.created_at.isoformat()
-        )
-    except InvalidAccountError as e:
+    account_service = AccountService(db)
+    account = account_service.get_account(account_id)
+    
+    # Verify user owns account
+    if account.user_id != user_id:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
         )
+    
+    return ORJSONResponse(_account_payload(account))
 
 
 @router.get(
     "/{account_id}/balance", 
-    response_model=BalanceResponse,
+    response_class=ORJSONResponse,
     summary="Get Account Balance",
     description="""
 Get the current balance of an account.
@@ -214,7 +200,7 @@ For full account details, use the GET /accounts/{account_id} endpoint.
         404: {"description": "Account not found", "model": ErrorResponse}
     }
 )
-async def get_balance(
+def get_balance(
     account_id: int,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
@@ -224,35 +210,29 @@ async def get_balance(
     
     Returns the real-time balance with precision to 2 decimal places.
     """
-    try:
-        account_service = AccountService(db)
-        account = account_service.get_account(account_id)
-        
-        # Verify user owns account
-        if account.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
-        
-        balance = account_service.get_balance(account_id)
-        
-        return BalanceResponse(
-            account_id=account.account_id,
-            balance=str(balance.amount),
-            currency=balance.currency,
-            last_updated=account.updated_at.isoformat()
-        )
-    except InvalidAccountError as e:
+    account_service = AccountService(db)
+    account = account_service.get_account_with_balance(account_id)
+    
+    # Verify user owns account
+    if account.user_id != user_id:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
         )
+    
+    balance = parse_money(account.balance, account.currency)
+    
+    return ORJSONResponse({
+        "account_id": account.account_id,
+        "balance": str(balance.amount),
+        "currency": balance.currency,
+        "last_updated": account.updated_at
+    })
 
 
 @router.get(
     "", 
-    response_model=List[AccountResponse],
+    response_class=ORJSONResponse,
     summary="List User Accounts",
     description="""
 List all accounts belonging to the authenticated user.
@@ -266,6 +246,7 @@ Returns an array of account objects, empty if no accounts exist.
     responses={
         200: {
             "description": "List of accounts",
+            "model": List[AccountResponse],
             "content": {
                 "application/json": {
                     "example": [
@@ -291,7 +272,7 @@ Returns an array of account objects, empty if no accounts exist.
         }
     }
 )
-async def list_accounts(
+def list_accounts(
     currency: Optional[str] = None,
     db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id)
@@ -304,15 +285,5 @@ async def list_accounts(
     account_service = AccountService(db)
     accounts = account_service.get_user_accounts(user_id, currency=currency)
     
-    return [
-        AccountResponse(
-            account_id=account.account_id,
-            user_id=account.user_id,
-            currency=account.currency,
-            balance=str(account.balance),
-            status=account.status.value,
-            created_at=account.created_at.isoformat()
-        )
-        for account in accounts
-    ]
+    return ORJSONResponse([_account_payload(account) for account in accounts])
 
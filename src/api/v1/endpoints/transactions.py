@@ -1,15 +1,21 @@
 """Transaction endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from sqlalchemy.engine import Row
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from starlette.background import BackgroundTask
+from typing import Optional, List, Union
 from datetime import datetime
 
-from src.db.database import get_db
+from src.api.responses import ORJSONResponse
+from src.core.config import settings
+from src.db.models import Transaction
+from src.services.cache import cache_service
 from src.services.payment_service import PaymentService
-from src.core.exceptions import InvalidAccountError
-from src.api.v1.dependencies import get_current_user_id
+from src.utils.pagination import decode_cursor, encode_cursor
+from src.api.v1.dependencies import get_current_user_id, get_payment_service
 from src.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -51,9 +57,13 @@ class TransactionResponse(BaseModel):
 class TransactionHistoryResponse(BaseModel):
     """Paginated response for transaction history."""
     transactions: List[TransactionResponse] = Field(..., description="List of transactions")
-    total_count: int = Field(..., description="Total number of transactions matching criteria")
-    limit: int = Field(..., description="Number of results per page")
-    offset: int = Field(..., description="Offset from start of results")
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page")
+    has_more: bool = Field(..., description="Whether more transactions exist after this page")
+    total_count: Optional[int] = Field(
+        None,
+        description="Deprecated - no longer computed and omitted from responses; use has_more",
+        json_schema_extra={"deprecated": True}
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -72,9 +82,8 @@ class TransactionHistoryResponse(BaseModel):
                         "completed_at": "2024-01-15T10:30:01Z"
                     }
                 ],
-                "total_count": 42,
-                "limit": 50,
-                "offset": 0
+                "next_cursor": "WyIyMDI0LTAxLTE1VDEwOjMwOjAwIiw1MDAxXQ",
+                "has_more": True
             }
         }
     )
@@ -104,9 +113,25 @@ class ErrorResponse(BaseModel):
     detail: str = Field(..., description="Error message")
 
 
+def _transaction_payload(t: Union[Transaction, Row]) -> dict:
+    """Build TransactionResponse-shaped payload from a Transaction or row, without model validation."""
+    return {
+        "transaction_id": t.transaction_id,
+        "from_account_id": t.from_account_id,
+        "to_account_id": t.to_account_id,
+        "amount": str(t.amount),
+        "currency": t.currency,
+        "transaction_type": t.transaction_type.value,
+        "status": t.status.value,
+        "description": t.description,
+        "created_at": t.created_at,
+        "completed_at": t.completed_at
+    }
+
+
 @router.get(
     "/{transaction_id}", 
-    response_model=TransactionResponse,
+    response_class=ORJSONResponse,
     summary="Get Transaction Details",
     description="""
 Retrieve detailed information about a specific transaction.
@@ -120,9 +145,9 @@ Only users who own either the source or destination account can view the transac
         404: {"description": "Transaction not found", "model": ErrorResponse}
     }
 )
-async def get_transaction(
+def get_transaction(
     transaction_id: int,
-    db: Session = Depends(get_db),
+    payment_service: PaymentService = Depends(get_payment_service),
     user_id: int = Depends(get_current_user_id)
 ):
     """
@@ -130,8 +155,19 @@ async def get_transaction(
     
     Returns full transaction details including status and timestamps.
     """
-    payment_service = PaymentService(db)
-    transaction = payment_service.get_transaction(transaction_id)
+    # Cached entries carry the owning user IDs so access can be checked
+    # without touching the database
+    cache_key = f"transaction:{transaction_id}"
+    cached = cache_service.get_json(cache_key)
+    if cached:
+        if user_id not in cached["owners"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        return ORJSONResponse(cached["transaction"])
+    
+    transaction = payment_service.get_transaction_with_accounts(transaction_id)
     
     if not transaction:
         raise HTTPException(
@@ -140,32 +176,29 @@ async def get_transaction(
         )
     
     # Verify user has access (owns one of the accounts)
-    account_service = payment_service.account_service
-    if transaction.from_account_id:
-        from_account = account_service.get_account(transaction.from_account_id)
-        if from_account.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
+    owners = {
+        account.user_id
+        for account in (transaction.from_account, transaction.to_account)
+        if account is not None
+    }
+    if user_id not in owners:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
     
-    return TransactionResponse(
-        transaction_id=transaction.transaction_id,
-        from_account_id=transaction.from_account_id,
-        to_account_id=transaction.to_account_id,
-        amount=str(transaction.amount),
-        currency=transaction.currency,
-        transaction_type=transaction.transaction_type.value,
-        status=transaction.status.value,
-        description=transaction.description,
-        created_at=transaction.created_at.isoformat(),
-        completed_at=transaction.completed_at.isoformat() if transaction.completed_at else None
+    payload = _transaction_payload(transaction)
+    cache_service.set_json(
+        cache_key,
+        {"owners": list(owners), "transaction": payload},
+        ttl=settings.TRANSACTION_CACHE_TTL_SECONDS
     )
+    return ORJSONResponse(payload)
 
 
 @router.get(
     "/account/{account_id}/history", 
-    response_model=TransactionHistoryResponse,
+    response_class=ORJSONResponse,
     summary="Get Transaction History",
     description="""
 Retrieve paginated transaction history for an account.
@@ -176,24 +209,25 @@ Retrieve paginated transaction history for an account.
 
 ## Pagination
 - **limit**: Number of results per page (1-100, default 50)
-- **offset**: Number of results to skip (default 0)
+- **cursor**: Opaque cursor from the previous page's `next_cursor`
 
 ## Ordering
 Results are ordered by creation date, most recent first.
     """,
     responses={
         200: {"description": "Transaction history", "model": TransactionHistoryResponse},
+        400: {"description": "Invalid cursor", "model": ErrorResponse},
         403: {"description": "Access denied - not account owner", "model": ErrorResponse},
         404: {"description": "Account not found", "model": ErrorResponse}
     }
 )
-async def get_transaction_history(
+def get_transaction_history(
     account_id: int,
     limit: int = Query(50, ge=1, le=100, description="Results per page"),
-    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
     start_date: Optional[datetime] = Query(None, description="Filter from date (ISO 8601)"),
     end_date: Optional[datetime] = Query(None, description="Filter until date (ISO 8601)"),
-    db: Session = Depends(get_db),
+    payment_service: PaymentService = Depends(get_payment_service),
     user_id: int = Depends(get_current_user_id)
 ):
     """
@@ -202,59 +236,46 @@ async def get_transaction_history(
     Returns paginated list of all transactions where the account
     was either the sender or receiver.
     """
-    try:
-        account_service = PaymentService(db).account_service
-        account = account_service.get_account(account_id)
-        
-        # Verify user owns account
-        if account.user_id != user_id:
+    before = None
+    if cursor:
+        try:
+            before = decode_cursor(cursor)
+        except ValueError as e:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
             )
-        
-        payment_service = PaymentService(db)
-        transactions = payment_service.get_account_transactions(
-            account_id=account_id,
-            limit=limit,
-            offset=offset,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        # Get total count (simplified - in production, use COUNT query)
-        total_count = len(transactions)  # This is approximate
-        
-        return TransactionHistoryResponse(
-            transactions=[
-                TransactionResponse(
-                    transaction_id=t.transaction_id,
-                    from_account_id=t.from_account_id,
-                    to_account_id=t.to_account_id,
-                    amount=str(t.amount),
-                    currency=t.currency,
-                    transaction_type=t.transaction_type.value,
-                    status=t.status.value,
-                    description=t.description,
-                    created_at=t.created_at.isoformat(),
-                    completed_at=t.completed_at.isoformat() if t.completed_at else None
-                )
-                for t in transactions
-            ],
-            total_count=total_count,
-            limit=limit,
-            offset=offset
-        )
-    except InvalidAccountError as e:
+    
+    account = payment_service.account_service.get_account(account_id)
+    
+    # Verify user owns account
+    if account.user_id != user_id:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
         )
+    
+    transactions, has_more = payment_service.get_account_transactions(
+        account_id=account_id,
+        limit=limit,
+        before=before,
+        start_date=start_date,
+        end_date=end_date
+    )
+    
+    return ORJSONResponse({
+        "transactions": [_transaction_payload(t) for t in transactions],
+        "next_cursor": (
+            encode_cursor(transactions[-1].created_at, transactions[-1].transaction_id)
+            if has_more else None
+        ),
+        "has_more": has_more
+    })
 
 
 @router.post(
     "/{transaction_id}/reverse", 
-    response_model=TransactionResponse,
+    response_class=ORJSONResponse,
     summary="Reverse Transaction",
     description="""
 Reverse a previously completed transaction.
@@ -270,6 +291,10 @@ Reverse a previously completed transaction.
 - Cannot reverse an already reversed transaction
 - Destination account must have sufficient funds
 
+## Idempotency
+Send an `Idempotency-Key` header to make retries safe. Without it a
+key is generated server-side and retries may create duplicate reversals.
+
 ## Audit Trail
 The reason is recorded in the audit log for compliance.
     """,
@@ -280,10 +305,16 @@ The reason is recorded in the audit log for compliance.
         404: {"description": "Transaction not found", "model": ErrorResponse}
     }
 )
-async def reverse_transaction(
+def reverse_transaction(
     transaction_id: int,
     request: ReverseTransactionRequest,
-    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Unique key for idempotent retries"
+    ),
+    payment_service: PaymentService = Depends(get_payment_service),
     user_id: int = Depends(get_current_user_id)
 ):
     """
@@ -292,36 +323,16 @@ async def reverse_transaction(
     Creates a reversal transaction that undoes the original transfer.
     A reason must be provided for audit compliance.
     """
-    import uuid
+    reversal = payment_service.reverse_transaction(
+        transaction_id=transaction_id,
+        reason=request.reason,
+        idempotency_key=idempotency_key or secrets.token_hex(16),
+        user_id=user_id
+    )
     
-    try:
-        payment_service = PaymentService(db)
-        reversal = payment_service.reverse_transaction(
-            transaction_id=transaction_id,
-            reason=request.reason,
-            idempotency_key=str(uuid.uuid4()),
-            user_id=user_id
-        )
-        
-        db.commit()
-        
-        return TransactionResponse(
-            transaction_id=reversal.transaction_id,
-            from_account_id=reversal.from_account_id,
-            to_account_id=reversal.to_account_id,
-            amount=str(reversal.amount),
-            currency=reversal.currency,
-            transaction_type=reversal.transaction_type.value,
-            status=reversal.status.value,
-            description=reversal.description,
-            created_at=reversal.created_at.isoformat(),
-            completed_at=reversal.completed_at.isoformat() if reversal.completed_at else None
-        )
-    except Exception as e:
-        db.rollback()
-        logger.error("Transaction reversal failed", error=str(e), transaction_id=transaction_id)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-
+    payment_service.commit()
+    
+    return ORJSONResponse(
+        _transaction_payload(reversal),
+        background=BackgroundTask(payment_service.warm_caches)
+    )
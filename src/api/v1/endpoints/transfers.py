@@ -1,22 +1,15 @@
 """Transfer endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, status, Request
 from pydantic import BaseModel, Field, ConfigDict
+from starlette.background import BackgroundTask
 from typing import Optional
-import uuid
+import secrets
 
-from src.db.database import get_db
+from src.api.responses import ORJSONResponse
 from src.services.payment_service import PaymentService
 from src.core.money import parse_money
-from src.core.exceptions import (
-    InsufficientFundsError,
-    InvalidAccountError,
-    InvalidAmountError,
-    CurrencyMismatchError,
-    DuplicateTransactionError
-)
-from src.api.v1.dependencies import get_current_user_id
+from src.api.v1.dependencies import get_current_user_id, get_payment_service
 from src.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -119,7 +112,7 @@ class ErrorResponse(BaseModel):
 
 @router.post(
     "", 
-    response_model=TransferResponse, 
+    response_class=ORJSONResponse, 
     status_code=status.HTTP_201_CREATED,
     summary="Transfer Money",
     description="""
@@ -174,10 +167,10 @@ Transfer money between two accounts atomically.
         }
     }
 )
-async def transfer_money(
+def transfer_money(
     request: TransferRequest,
     http_request: Request,
-    db: Session = Depends(get_db),
+    payment_service: PaymentService = Depends(get_payment_service),
     user_id: int = Depends(get_current_user_id)
 ):
     """
@@ -190,58 +183,40 @@ async def transfer_money(
     - Audit trail is created
     """
     # Generate idempotency key if not provided
-    idempotency_key = request.idempotency_key or str(uuid.uuid4())
+    idempotency_key = request.idempotency_key or secrets.token_hex(16)
     
-    try:
-        amount = parse_money(request.amount, request.currency)
-        
-        payment_service = PaymentService(db)
-        transaction = payment_service.transfer_money(
-            from_account_id=request.from_account_id,
-            to_account_id=request.to_account_id,
-            amount=amount,
-            idempotency_key=idempotency_key,
-            description=request.description,
-            reference_id=request.reference_id,
-            user_id=user_id,
-            ip_address=http_request.client.host if http_request.client else None,
-            user_agent=http_request.headers.get("user-agent")
-        )
-        
-        db.commit()
-        
-        return TransferResponse(
-            transaction_id=transaction.transaction_id,
-            from_account_id=transaction.from_account_id,
-            to_account_id=transaction.to_account_id,
-            amount=str(transaction.amount),
-            currency=transaction.currency,
-            status=transaction.status.value,
-            created_at=transaction.created_at.isoformat()
-        )
-    except DuplicateTransactionError as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=str(e)
-        )
-    except InsufficientFundsError as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except (InvalidAccountError, InvalidAmountError, CurrencyMismatchError) as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        db.rollback()
-        logger.error("Transfer failed", error=str(e), user_id=user_id)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Transfer failed"
-        )
-
+    # Audit context - the real client IP is resolved once by RateLimitMiddleware
+    client_ip = getattr(http_request.state, "client_ip", None)
+    if client_ip is None and http_request.client:
+        client_ip = http_request.client.host
+    user_agent = http_request.headers.get("user-agent")
+    
+    amount = parse_money(request.amount, request.currency)
+    
+    transaction = payment_service.transfer_money(
+        from_account_id=request.from_account_id,
+        to_account_id=request.to_account_id,
+        amount=amount,
+        idempotency_key=idempotency_key,
+        description=request.description,
+        reference_id=request.reference_id,
+        user_id=user_id,
+        ip_address=client_ip,
+        user_agent=user_agent
+    )
+    
+    payment_service.commit()
+    
+    return ORJSONResponse(
+        {
+            "transaction_id": transaction.transaction_id,
+            "from_account_id": transaction.from_account_id,
+            "to_account_id": transaction.to_account_id,
+            "amount": str(transaction.amount),
+            "currency": transaction.currency,
+            "status": transaction.status.value,
+            "created_at": transaction.created_at
+        },
+        status_code=status.HTTP_201_CREATED,
+        background=BackgroundTask(payment_service.warm_caches)
+    )
@@ -1,67 +1,100 @@
 """Custom exceptions for the payment system."""
 
+from typing import ClassVar
+
 
 class PaymentSystemException(Exception):
-    """Base exception for payment system."""
-    pass
+    """
+    Base exception for payment system.
+    
+    http_status is the HTTP status the API responds with; subclasses
+    override it where it differs from 400.
+    """
+    
+    __slots__ = ()
+    http_status: ClassVar[int] = 400
 
 
 class InsufficientFundsError(PaymentSystemException):
     """Raised when account has insufficient funds."""
-    pass
+    
+    __slots__ = ()
 
 
 class InvalidAccountError(PaymentSystemException):
     """Raised when account is invalid or not found."""
-    pass
+    
+    __slots__ = ()
+    http_status = 404
 
 
 class InvalidAmountError(PaymentSystemException):
     """Raised when transaction amount is invalid."""
-    pass
+    
+    __slots__ = ()
 
 
 class AccountSuspendedError(PaymentSystemException):
     """Raised when account is suspended."""
-    pass
+    
+    __slots__ = ()
+    http_status = 403
 
 
 class TransactionLimitExceededError(PaymentSystemException):
     """Raised when transaction limit is exceeded."""
-    pass
+    
+    __slots__ = ()
 
 
 class DuplicateTransactionError(PaymentSystemException):
     """Raised when duplicate transaction is detected."""
-    pass
+    
+    __slots__ = ()
+    http_status = 409
 
 
 class CurrencyMismatchError(PaymentSystemException):
     """Raised when currencies don't match."""
-    pass
+    
+    __slots__ = ()
+
+
+class InvalidCurrencyError(PaymentSystemException):
+    """Raised when a currency is not an ISO 4217 code."""
+    
+    __slots__ = ()
 
 
 class DatabaseError(PaymentSystemException):
     """Raised when database operation fails."""
-    pass
+    
+    __slots__ = ()
 
 
 class ConcurrentModificationError(PaymentSystemException):
     """Raised when concurrent modification is detected."""
-    pass
+    
+    __slots__ = ()
 
 
 class RateLimitExceededError(PaymentSystemException):
     """Raised when rate limit is exceeded."""
-    pass
+    
+    __slots__ = ()
+    http_status = 429
 
 
 class AuthenticationError(PaymentSystemException):
     """Raised when authentication fails."""
-    pass
+    
+    __slots__ = ()
+    http_status = 401
 
 
 class PermissionDeniedError(PaymentSystemException):
     """Raised when user doesn't have permission."""
-    pass
+    
+    __slots__ = ()
+    http_status = 403
 
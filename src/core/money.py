@@ -1,17 +1,80 @@
 """Money handling utilities - Never use floats!"""
 
+import sys
 from decimal import Decimal, ROUND_HALF_UP, getcontext
-from typing import Union
+from typing import Iterable, Union
+
+from src.core.exceptions import InvalidAmountError
 
 
 # Configure decimal context
 getcontext().prec = 28
 getcontext().rounding = ROUND_HALF_UP
 
+# ISO 4217 currency codes (list one), including fund codes, precious metals
+# and other X-codes; only enforced when accounts are created
+_ISO4217 = frozenset({
+    "AED", "AFN", "ALL", "AMD", "ANG", "AOA", "ARS", "AUD", "AWG", "AZN",
+    "BAM", "BBD", "BDT", "BGN", "BHD", "BIF", "BMD", "BND", "BOB", "BOV",
+    "BRL", "BSD", "BTN", "BWP", "BYN", "BZD", "CAD", "CDF", "CHE", "CHF",
+    "CHW", "CLF", "CLP", "CNY", "COP", "COU", "CRC", "CUP", "CVE", "CZK",
+    "DJF", "DKK", "DOP", "DZD", "EGP", "ERN", "ETB", "EUR", "FJD", "FKP",
+    "GBP", "GEL", "GHS", "GIP", "GMD", "GNF", "GTQ", "GYD", "HKD", "HNL",
+    "HTG", "HUF", "IDR", "ILS", "INR", "IQD", "IRR", "ISK", "JMD", "JOD",
+    "JPY", "KES", "KGS", "KHR", "KMF", "KPW", "KRW", "KWD", "KYD", "KZT",
+    "LAK", "LBP", "LKR", "LRD", "LSL", "LYD", "MAD", "MDL", "MGA", "MKD",
+    "MMK", "MNT", "MOP", "MRU", "MUR", "MVR", "MWK", "MXN", "MXV", "MYR",
+    "MZN", "NAD", "NGN", "NIO", "NOK", "NPR", "NZD", "OMR", "PAB", "PEN",
+    "PGK", "PHP", "PKR", "PLN", "PYG", "QAR", "RON", "RSD", "RUB", "RWF",
+    "SAR", "SBD", "SCR", "SDG", "SEK", "SGD", "SHP", "SLE", "SOS", "SRD",
+    "SSP", "STN", "SVC", "SYP", "SZL", "THB", "TJS", "TMT", "TND", "TOP",
+    "TRY", "TTD", "TWD", "TZS", "UAH", "UGX", "USD", "USN", "UYI", "UYU",
+    "UYW", "UZS", "VED", "VES", "VND", "VUV", "WST", "XAF", "XAG", "XAU",
+    "XBA", "XBB", "XBC", "XBD", "XCD", "XCG", "XDR", "XOF", "XPD", "XPF",
+    "XPT", "XSU", "XTS", "XUA", "XXX", "YER", "ZAR", "ZMW", "ZWG",
+})
+
+# Canonical (interned) code for each currency, so Money instances share one
+# string per currency and the arithmetic guards can compare by identity.
+# Codes outside the list (e.g. withdrawn ones on old accounts) are added on
+# first use.
+_CURRENCIES = {code: sys.intern(code) for code in _ISO4217}
+
+
+def _canonical_currency(currency: str) -> str:
+    """
+    Return the interned, upper-cased code for a currency.
+    
+    Any code is accepted, so amounts in currencies already stored keep
+    working; new accounts are checked with is_iso4217().
+    """
+    code = _CURRENCIES.get(currency)
+    if code is None:
+        upper = currency.upper()
+        code = _CURRENCIES.get(upper)
+        if code is None:
+            code = sys.intern(upper)
+            if len(code) == 3:
+                _CURRENCIES[code] = code
+    return code
+
+
+def is_iso4217(currency: str) -> bool:
+    """Check whether a currency is an ISO 4217 code (case-insensitive)."""
+    return currency.upper() in _ISO4217
+
+
+_ZERO = Decimal(0)
+
+# Quantization exponents for Money.quantize, keyed by decimal places
+_QUANTA = {places: Decimal(1).scaleb(-places) for places in range(10)}
+
 
 class Money:
     """Money type that uses Decimal for exact precision."""
     
+    __slots__ = ("amount", "currency")
+    
     def __init__(self, amount: Union[str, Decimal, int, float], currency: str = "USD"):
         """
         Initialize Money object.
@@ -20,6 +83,9 @@ class Money:
             amount: Amount as string, Decimal, int, or float
             currency: ISO 4217 currency code (default: USD)
         
+        Raises:
+            ValueError: If the amount is negative
+        
         Note: Always prefer string or Decimal to avoid float precision issues.
         """
         if isinstance(amount, str):
@@ -32,64 +98,125 @@ class Money:
         else:
             raise ValueError(f"Invalid amount type: {type(amount)}")
         
-        self.currency = currency.upper()
+        self.currency = _canonical_currency(currency)
         
         # Validate amount is non-negative
-        if self.amount < 0:
+        if self.amount < _ZERO:
+            raise ValueError("Amount cannot be negative")
+    
+    @classmethod
+    def _new(cls, amount: Decimal, currency: str) -> "Money":
+        """
+        Build a Money from an already-validated Decimal and currency.
+        
+        Skips __init__ validation; for arithmetic results only.
+        """
+        money = object.__new__(cls)
+        money.amount = amount
+        money.currency = currency
+        return money
+    
+    @classmethod
+    def from_minor(cls, units: int, currency: str = "USD") -> "Money":
+        """
+        Build Money from an integer amount of minor units (e.g. cents).
+        
+        Args:
+            units: Amount in minor units
+            currency: ISO 4217 currency code (default: USD)
+        
+        Returns:
+            Money with two decimal places
+        """
+        if units < 0:
             raise ValueError("Amount cannot be negative")
+        return cls._new(Decimal(units).scaleb(-2), _canonical_currency(currency))
+    
+    @property
+    def minor(self) -> int:
+        """
+        Amount in integer minor units (e.g. cents).
+        
+        Raises:
+            ValueError: If the amount has sub-minor-unit precision
+        """
+        units = self.amount.scaleb(2)
+        if units != units.to_integral_value():
+            raise ValueError(f"Amount {self.amount} has sub-minor-unit precision")
+        return int(units)
     
     def __add__(self, other: "Money") -> "Money":
         """Add two Money objects."""
-        if self.currency != other.currency:
+        if self.currency is not other.currency:
             raise ValueError(f"Cannot add {self.currency} and {other.currency}")
-        return Money(self.amount + other.amount, self.currency)
+        return Money._new(self.amount + other.amount, self.currency)
     
     def __sub__(self, other: "Money") -> "Money":
         """Subtract two Money objects."""
-        if self.currency != other.currency:
+        if self.currency is not other.currency:
             raise ValueError(f"Cannot subtract {self.currency} and {other.currency}")
         result = self.amount - other.amount
-        if result < 0:
+        if result < _ZERO:
             raise ValueError("Result cannot be negative")
-        return Money(result, self.currency)
+        return Money._new(result, self.currency)
     
-    def __mul__(self, multiplier: Union[int, float, Decimal]) -> "Money":
-        """Multiply Money by a number."""
-        if isinstance(multiplier, (int, float)):
-            multiplier = Decimal(str(multiplier))
-        return Money(self.amount * multiplier, self.currency)
+    def __mul__(self, multiplier: Union[int, Decimal]) -> "Money":
+        """
+        Multiply Money by an int or Decimal.
+        
+        Raises:
+            TypeError: If multiplier is a float (convert via str to Decimal)
+        """
+        if isinstance(multiplier, float):
+            raise TypeError("Cannot multiply Money by float; use Decimal")
+        result = self.amount * multiplier
+        if result < _ZERO:
+            raise ValueError("Amount cannot be negative")
+        return Money._new(result, self.currency)
     
-    def __truediv__(self, divisor: Union[int, float, Decimal]) -> "Money":
-        """Divide Money by a number."""
-        if isinstance(divisor, (int, float)):
-            divisor = Decimal(str(divisor))
-        return Money(self.amount / divisor, self.currency)
+    def __truediv__(self, divisor: Union[int, Decimal]) -> "Money":
+        """
+        Divide Money by an int or Decimal.
+        
+        Raises:
+            TypeError: If divisor is a float (convert via str to Decimal)
+        """
+        if isinstance(divisor, float):
+            raise TypeError("Cannot divide Money by float; use Decimal")
+        result = self.amount / divisor
+        if result < _ZERO:
+            raise ValueError("Amount cannot be negative")
+        return Money._new(result, self.currency)
     
     def __eq__(self, other: "Money") -> bool:
         """Check equality."""
-        return self.amount == other.amount and self.currency == other.currency
+        return self.amount == other.amount and self.currency is other.currency
+    
+    def __hash__(self) -> int:
+        """Hash consistent with __eq__."""
+        return hash((self.amount, self.currency))
     
     def __lt__(self, other: "Money") -> bool:
         """Less than comparison."""
-        if self.currency != other.currency:
+        if self.currency is not other.currency:
             raise ValueError(f"Cannot compare {self.currency} and {other.currency}")
         return self.amount < other.amount
     
     def __le__(self, other: "Money") -> bool:
         """Less than or equal comparison."""
-        if self.currency != other.currency:
+        if self.currency is not other.currency:
             raise ValueError(f"Cannot compare {self.currency} and {other.currency}")
         return self.amount <= other.amount
     
     def __gt__(self, other: "Money") -> bool:
         """Greater than comparison."""
-        if self.currency != other.currency:
+        if self.currency is not other.currency:
             raise ValueError(f"Cannot compare {self.currency} and {other.currency}")
         return self.amount > other.amount
     
     def __ge__(self, other: "Money") -> bool:
         """Greater than or equal comparison."""
-        if self.currency != other.currency:
+        if self.currency is not other.currency:
             raise ValueError(f"Cannot compare {self.currency} and {other.currency}")
         return self.amount >= other.amount
     
@@ -107,24 +234,53 @@ class Money:
     
     def quantize(self, decimal_places: int = 2) -> "Money":
         """Round to specified decimal places."""
-        quantized = self.amount.quantize(Decimal('0.1') ** decimal_places, rounding=ROUND_HALF_UP)
-        return Money(quantized, self.currency)
+        quantum = _QUANTA.get(decimal_places)
+        if quantum is None:
+            quantum = Decimal(1).scaleb(-decimal_places)
+        quantized = self.amount.quantize(quantum, rounding=ROUND_HALF_UP)
+        return Money._new(quantized, self.currency)
     
     def is_zero(self) -> bool:
         """Check if amount is zero."""
-        return self.amount == Decimal('0')
+        return not self.amount
     
     def is_positive(self) -> bool:
         """Check if amount is positive."""
-        return self.amount > Decimal('0')
+        return self.amount > _ZERO
 
 
 def parse_money(amount: Union[str, Decimal, int, float], currency: str = "USD") -> Money:
-    """Parse amount into Money object."""
-    return Money(amount, currency)
+    """
+    Parse amount into Money object.
+    
+    Raises:
+        InvalidAmountError: If the amount is malformed or negative
+    """
+    try:
+        return Money(amount, currency)
+    except (ValueError, ArithmeticError) as e:
+        raise InvalidAmountError(f"Invalid amount: {amount} {currency}") from e
 
 
 def zero_money(currency: str = "USD") -> Money:
     """Create zero Money object."""
-    return Money(Decimal('0'), currency)
+    return Money._new(_ZERO, _canonical_currency(currency))
+
 
+def sum_money(amounts: Iterable[Money], currency: str = "USD") -> Money:
+    """
+    Sum Money values of a single currency.
+    
+    Adds the underlying Decimals in one pass rather than building an
+    intermediate Money per addition.
+    
+    Raises:
+        ValueError: If any amount is in a different currency
+    """
+    currency = _canonical_currency(currency)
+    total = _ZERO
+    for money in amounts:
+        if money.currency is not currency:
+            raise ValueError(f"Cannot add {currency} and {money.currency}")
+        total += money.amount
+    return Money._new(total, currency)
@@ -1,39 +1,85 @@
 """Database configuration and session management."""
 
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Generator
 
 from src.core.config import settings
+from src.utils.json_serialization import json_dumps_text, json_loads
 
-# Create database engine
+# Create database engine. Connections are reset with a ROLLBACK when
+# returned to the pool, and nothing here relies on session-level state
+# (SET, prepared statements, server-side cursors, advisory locks), so the
+# engine also works behind PgBouncer in transaction pooling mode.
 engine = create_engine(
     settings.DATABASE_URL,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+    # A pre-ping costs a round-trip per checkout; pool_recycle already
+    # retires connections before typical server/proxy idle timeouts
+    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+    pool_reset_on_return="rollback",
+    # JSON columns (idempotency responses, audit data) use orjson too
+    json_serializer=json_dumps_text,
+    json_deserializer=json_loads,
     echo=settings.DEBUG,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory. Objects aren't expired on commit, so responses
+# built from them after commit don't re-SELECT every attribute; locking
+# reads use populate_existing to refresh them instead.
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine
+)
 
 # Base class for models
 Base = declarative_base()
 
+# Dialect-specific INSERT constructs (support ON CONFLICT)
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 def get_db() -> Generator[Session, None, None]:
-    """Dependency for getting database session."""
+    """
+    Dependency for getting database session.
+    
+    Rolls back automatically if the request raises, so handlers don't
+    need their own try/except around writes.
+    """
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
 
+def upsert_insert(db: Session, model: Any):
+    """
+    Build an INSERT for the session's dialect that supports ON CONFLICT.
+    
+    Args:
+        db: Database session
+        model: Mapped class to insert into
+    
+    Returns:
+        Dialect-specific Insert construct
+    """
+    return _INSERTS[db.get_bind().dialect.name](model)
+
+
 @contextmanager
 def db_transaction():
     """Context manager for database transactions."""
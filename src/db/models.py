@@ -1,12 +1,13 @@
 """Database models for the payment system."""
 
 from sqlalchemy import Column, BigInteger, String, DECIMAL, Enum, Text, TIMESTAMP, ForeignKey, Integer, JSON, Index
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 
 from src.db.database import Base
+from src.utils.ids import id_generator
 
 
 class AccountStatus(str, enum.Enum):
@@ -39,16 +40,40 @@ class EntryType(str, enum.Enum):
     CREDIT = "CREDIT"
 
 
+def _native_enum(enum_class: type, name: str) -> Enum:
+    """
+    Column type for an enum, stored as a native PostgreSQL ENUM.
+    
+    Native enums take 4 bytes per row instead of a VARCHAR plus CHECK
+    constraint. The database labels are the member values, and the type names
+    match the ones SQLAlchemy derived from the class names, so existing
+    databases keep working.
+    
+    Args:
+        enum_class: Python enum to store
+        name: Database type name
+    
+    Returns:
+        SQLAlchemy Enum type persisting member values
+    """
+    return Enum(
+        enum_class,
+        name=name,
+        native_enum=True,
+        values_callable=lambda members: [member.value for member in members],
+    )
+
+
 class Account(Base):
     """Account model."""
     
     __tablename__ = "accounts"
     
-    account_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    account_id = Column(BigInteger, primary_key=True, autoincrement=False, default=id_generator.next_id)
     user_id = Column(BigInteger, nullable=False, index=True)
     currency = Column(String(3), nullable=False)  # ISO 4217
     balance = Column(DECIMAL(20, 2), nullable=False, default=0.00)
-    status = Column(Enum(AccountStatus), nullable=False, default=AccountStatus.ACTIVE, index=True)
+    status = Column(_native_enum(AccountStatus, "accountstatus"), nullable=False, default=AccountStatus.ACTIVE, index=True)
     version = Column(Integer, nullable=False, default=0)  # For optimistic locking
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp())
     updated_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp(), onupdate=func.current_timestamp())
@@ -59,6 +84,12 @@ class Account(Base):
     entries = relationship("TransactionEntry", back_populates="account")
     audit_logs = relationship("AuditLog", back_populates="account")
     
+    # Indexes
+    __table_args__ = (
+        # Partial: most lookups are for active accounts, which a small index covers
+        Index('idx_active_user', 'user_id', postgresql_where=text("status = 'ACTIVE'")),
+    )
+    
     def __repr__(self):
         return f"<Account(account_id={self.account_id}, user_id={self.user_id}, balance={self.balance}, currency={self.currency})>"
 
@@ -68,13 +99,13 @@ class Transaction(Base):
     
     __tablename__ = "transactions"
     
-    transaction_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    transaction_id = Column(BigInteger, primary_key=True, autoincrement=False, default=id_generator.next_id)
     from_account_id = Column(BigInteger, ForeignKey("accounts.account_id"), nullable=True)
     to_account_id = Column(BigInteger, ForeignKey("accounts.account_id"), nullable=True)
     amount = Column(DECIMAL(20, 2), nullable=False)
     currency = Column(String(3), nullable=False)
-    transaction_type = Column(Enum(TransactionType), nullable=False)
-    status = Column(Enum(TransactionStatus), nullable=False, default=TransactionStatus.PENDING, index=True)
+    transaction_type = Column(_native_enum(TransactionType, "transactiontype"), nullable=False)
+    status = Column(_native_enum(TransactionStatus, "transactionstatus"), nullable=False, default=TransactionStatus.PENDING, index=True)
     idempotency_key = Column(String(255), nullable=False, unique=True, index=True)
     reference_id = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
@@ -82,16 +113,23 @@ class Transaction(Base):
     completed_at = Column(TIMESTAMP, nullable=True)
     
     # Relationships
-    from_account = relationship("Account", foreign_keys=[from_account_id], back_populates="transactions_from")
-    to_account = relationship("Account", foreign_keys=[to_account_id], back_populates="transactions_to")
+    # lazy="raise": load explicitly (joinedload) rather than a query per access
+    from_account = relationship("Account", foreign_keys=[from_account_id], back_populates="transactions_from", lazy="raise")
+    to_account = relationship("Account", foreign_keys=[to_account_id], back_populates="transactions_to", lazy="raise")
     entries = relationship("TransactionEntry", back_populates="transaction")
     audit_logs = relationship("AuditLog", back_populates="transaction")
     
     # Indexes
     __table_args__ = (
-        Index('idx_from_account_created', 'from_account_id', 'created_at'),
-        Index('idx_to_account_created', 'to_account_id', 'created_at'),
-        Index('idx_status_created', 'status', 'created_at'),
+        Index('idx_from_account_created', 'from_account_id', created_at.desc(), transaction_id.desc()),
+        Index('idx_to_account_created', 'to_account_id', created_at.desc(), transaction_id.desc()),
+        # Covering, so status listings can be answered by index-only scans
+        Index(
+            'idx_status_created', 'status', 'created_at',
+            postgresql_include=['amount', 'currency', 'from_account_id', 'to_account_id']
+        ),
+        # Partial: pending transactions are a small fraction of the table
+        Index('idx_pending_tx_created', 'created_at', postgresql_where=text("status = 'PENDING'")),
     )
     
     def __repr__(self):
@@ -103,10 +141,10 @@ class TransactionEntry(Base):
     
     __tablename__ = "transaction_entries"
     
-    entry_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    entry_id = Column(BigInteger, primary_key=True, autoincrement=False, default=id_generator.next_id)
     transaction_id = Column(BigInteger, ForeignKey("transactions.transaction_id"), nullable=False, index=True)
     account_id = Column(BigInteger, ForeignKey("accounts.account_id"), nullable=False, index=True)
-    entry_type = Column(Enum(EntryType), nullable=False)
+    entry_type = Column(_native_enum(EntryType, "entrytype"), nullable=False)
     amount = Column(DECIMAL(20, 2), nullable=False)
     currency = Column(String(3), nullable=False)
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp())
@@ -124,7 +162,7 @@ class AuditLog(Base):
     
     __tablename__ = "audit_logs"
     
-    log_id = Column(BigInteger, primary_key=True, autoincrement=True)
+    log_id = Column(BigInteger, primary_key=True, autoincrement=False, default=id_generator.next_id)
     transaction_id = Column(BigInteger, ForeignKey("transactions.transaction_id"), nullable=True, index=True)
     account_id = Column(BigInteger, ForeignKey("accounts.account_id"), nullable=True, index=True)
     action = Column(String(50), nullable=False)
@@ -151,7 +189,7 @@ class IdempotencyKey(Base):
     
     idempotency_key = Column(String(255), primary_key=True)
     transaction_id = Column(BigInteger, ForeignKey("transactions.transaction_id"), nullable=True)
-    request_hash = Column(String(64), nullable=True)
+    request_hash = Column(String(32), nullable=True)
     response_data = Column(JSON, nullable=True)
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp())
     expires_at = Column(TIMESTAMP, nullable=False, index=True)
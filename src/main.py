@@ -1,16 +1,18 @@
 """Main application entry point."""
 
 from fastapi import FastAPI
+from fastapi.routing import APIRoute
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.openapi.utils import get_openapi
 from contextlib import asynccontextmanager
 
+from src.api.responses import ORJSONResponse
 from src.api.v1.router import api_router
 from src.api.error_handlers import register_error_handlers
-from src.api.middleware import RateLimitMiddleware, LoggingMiddleware
+from src.api.middleware import LoggingMiddleware, MetricsMiddleware, RateLimitMiddleware
 from src.core.config import settings
-from src.db.database import engine, Base
 from src.core.logging import setup_logging
+from src.services.cache import async_cache_service
+from src.utils.ids import id_generator
 
 
 # OpenAPI Tags metadata for Swagger documentation
@@ -34,16 +36,48 @@ tags_metadata = [
 ]
 
 
+def check_unique_routes(app: FastAPI) -> None:
+    """
+    Fail fast if two endpoints are registered for the same path and method.
+    
+    Starlette matches routes with a linear scan, so a duplicate silently
+    shadows the later registration instead of raising.
+    
+    Args:
+        app: Application whose routes are checked
+    
+    Raises:
+        RuntimeError: If a (path, method) pair is registered twice
+    """
+    seen = set()
+    for route in app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in route.methods:
+            key = (route.path, method)
+            if key in seen:
+                raise RuntimeError(f"Duplicate route registered: {method} {route.path}")
+            seen.add(key)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     setup_logging()
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
+    check_unique_routes(app)
+    # Build the OpenAPI schema now rather than on the first /docs hit;
+    # FastAPI keeps it on app.openapi_schema for later requests
+    app.openapi()
+    # Tables are managed by Alembic migrations (alembic upgrade head)
+    # Lease this process's Snowflake worker ID now, so a missing Redis
+    # fails startup instead of the first insert
+    id_generator.worker_id
+    # Preload Lua scripts used on the request path
+    await async_cache_service.load_scripts()
     yield
     # Shutdown
-    pass
+    await async_cache_service.close()
 
 
 # API description for Swagger
@@ -108,6 +142,7 @@ app = FastAPI(
     redoc_url="/redoc",
     openapi_url="/openapi.json",
     openapi_tags=tags_metadata,
+    default_response_class=ORJSONResponse,
     contact={
         "name": "Payment System Support",
         "email": "support@payment-system.com",
@@ -130,6 +165,8 @@ app.add_middleware(
 # Custom middleware
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(RateLimitMiddleware)
+if settings.ENABLE_METRICS:
+    app.add_middleware(MetricsMiddleware)
 
 # Register error handlers
 register_error_handlers(app)
@@ -174,3 +211,22 @@ async def root():
         }
     }
 
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    if settings.ID_WORKER_ID is not None and settings.UVICORN_WORKERS > 1:
+        # Every worker would mint IDs with the same worker ID
+        raise SystemExit(
+            "ID_WORKER_ID can only be set with UVICORN_WORKERS=1; "
+            "leave it unset to lease a worker ID per process from Redis"
+        )
+    
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=settings.UVICORN_WORKERS,
+        loop="uvloop",
+        http="httptools"
+    )
@@ -1,17 +1,35 @@
 """Account service for managing accounts."""
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import and_, case, event, insert, lambda_stmt, select, update
+from sqlalchemy.engine import Row
 from decimal import Decimal
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
 
 from src.db.models import Account, AccountStatus, AuditLog
-from src.core.money import Money, parse_money
-from src.core.exceptions import InvalidAccountError, AccountSuspendedError
+from src.core.config import settings
+from src.core.money import Money, is_iso4217, parse_money
+from src.core.exceptions import InvalidAccountError, AccountSuspendedError, InvalidCurrencyError
 from src.core.logging import get_logger
-from src.services.cache import cache_service
+from src.services.cache import cache_service, invalidate_on_commit
+from src.utils.ids import id_generator
 
 logger = get_logger(__name__)
 
+# session.info key holding audit log rows to insert when the transaction commits
+_PENDING_AUDIT_LOGS = "audit_logs"
+
+
+class AccountBalance(NamedTuple):
+    """Balance projection of an account."""
+    account_id: int
+    user_id: int
+    currency: str
+    balance: Decimal
+    updated_at: datetime
+
 
 class AccountService:
     """Service for account operations."""
@@ -20,13 +38,19 @@ class AccountService:
         """Initialize account service."""
         self.db = db
     
-    def get_account(self, account_id: int, use_cache: bool = True) -> Account:
+    def commit(self) -> None:
+        """Commit the unit of work."""
+        self.db.commit()
+    
+    def get_account(self, account_id: int) -> Account:
         """
         Get account by ID.
         
+        Always reads the database: callers need a session-bound Account.
+        Balance reads should use get_account_with_balance(), which is cached.
+        
         Args:
             account_id: Account ID
-            use_cache: Whether to use cache
         
         Returns:
             Account object
@@ -34,18 +58,73 @@ class AccountService:
         Raises:
             InvalidAccountError: If account not found
         """
-        # Check cache first
+        account = self.db.execute(
+            lambda_stmt(lambda: select(Account).where(Account.account_id == account_id))
+        ).scalar_one_or_none()
+        if not account:
+            raise InvalidAccountError(f"Account {account_id} not found")
+        
+        return account
+    
+    def get_account_with_balance(self, account_id: int, use_cache: bool = True) -> AccountBalance:
+        """
+        Get account ownership and balance in a single query.
+        
+        Selects only the columns needed for balance reads, so callers don't
+        need a separate get_account() + get_balance() round-trip. The result
+        is cached until a committed write to the account invalidates it.
+        
+        Args:
+            account_id: Account ID
+            use_cache: Whether to use cache
+        
+        Returns:
+            AccountBalance projection
+        
+        Raises:
+            InvalidAccountError: If account not found
+        """
+        cache_key = f"balance:{account_id}"
+        
         if use_cache:
-            cache_key = f"account:{account_id}"
             cached = cache_service.get_json(cache_key)
             if cached:
-                # Still need to get from DB for operations, but cache helps for reads
-                pass
-        
-        account = self.db.query(Account).filter(Account.account_id == account_id).first()
-        if not account:
+                return AccountBalance(
+                    account_id=cached["account_id"],
+                    user_id=cached["user_id"],
+                    currency=cached["currency"],
+                    balance=Decimal(cached["balance"]),
+                    updated_at=datetime.fromisoformat(cached["updated_at"])
+                )
+        
+        row = self.db.execute(
+            lambda_stmt(lambda: select(
+                Account.account_id,
+                Account.user_id,
+                Account.currency,
+                Account.balance,
+                Account.updated_at
+            ).where(Account.account_id == account_id))
+        ).first()
+        
+        if row is None:
             raise InvalidAccountError(f"Account {account_id} not found")
         
+        account = AccountBalance(*row)
+        
+        if use_cache:
+            cache_service.set_json(
+                cache_key,
+                {
+                    "account_id": account.account_id,
+                    "user_id": account.user_id,
+                    "currency": account.currency,
+                    "balance": str(account.balance),
+                    "updated_at": account.updated_at.isoformat()
+                },
+                ttl=settings.BALANCE_CACHE_TTL_SECONDS
+            )
+        
         return account
     
     def get_account_for_update(self, account_id: int) -> Account:
@@ -61,9 +140,12 @@ class AccountService:
         Raises:
             InvalidAccountError: If account not found
         """
-        account = self.db.query(Account).filter(
-            Account.account_id == account_id
-        ).with_for_update().first()
+        account = self.db.execute(
+            lambda_stmt(lambda: select(Account).where(Account.account_id == account_id).with_for_update()),
+            # Sessions don't expire on commit; a locking read must refresh
+            # any copy already in the identity map
+            execution_options={"populate_existing": True}
+        ).scalar_one_or_none()
         
         if not account:
             raise InvalidAccountError(f"Account {account_id} not found")
@@ -73,21 +155,93 @@ class AccountService:
         
         return account
     
-    def get_user_accounts(self, user_id: int, currency: str = None) -> list[Account]:
+    def get_accounts_for_update(self, account_ids: Iterable[int]) -> Dict[int, Account]:
+        """
+        Get several accounts with pessimistic locks in a single query.
+        
+        Rows are locked in account_id order, so concurrent transfers between
+        the same accounts can't deadlock by locking them in opposite orders.
+        
+        Args:
+            account_ids: Account IDs; validated in the order given
+        
+        Returns:
+            Locked accounts keyed by account_id
+        
+        Raises:
+            InvalidAccountError: If an account is not found
+            AccountSuspendedError: If an account is not active
+        """
+        account_ids = list(account_ids)
+        lock_ids = sorted(set(account_ids))
+        accounts = {
+            account.account_id: account
+            for account in self.db.scalars(
+                lambda_stmt(lambda: select(Account)
+                    .where(Account.account_id.in_(lock_ids))
+                    .order_by(Account.account_id)
+                    .with_for_update()),
+                execution_options={"populate_existing": True}
+            )
+        }
+        
+        for account_id in account_ids:
+            account = accounts.get(account_id)
+            if account is None:
+                raise InvalidAccountError(f"Account {account_id} not found")
+            if account.status != AccountStatus.ACTIVE:
+                raise AccountSuspendedError(f"Account {account_id} is {account.status.value}")
+        
+        return accounts
+    
+    def get_user_accounts(self, user_id: int, currency: str = None) -> list[Row]:
         """
         Get all accounts for a user.
         
+        Returns plain rows of the listed columns rather than Account objects,
+        so read-only listings skip ORM instantiation and the identity map.
+        
         Args:
             user_id: User ID
             currency: Optional currency filter
         
         Returns:
-            List of accounts
+            List of rows with account_id, user_id, currency, balance, status, created_at
         """
-        query = self.db.query(Account).filter(Account.user_id == user_id)
+        query = lambda_stmt(lambda: select(
+            Account.account_id,
+            Account.user_id,
+            Account.currency,
+            Account.balance,
+            Account.status,
+            Account.created_at
+        ).where(Account.user_id == user_id))
         if currency:
-            query = query.filter(Account.currency == currency.upper())
-        return query.all()
+            currency_code = currency.upper()
+            query += lambda s: s.where(Account.currency == currency_code)
+        return self.db.execute(query).all()
+    
+    def get_accounts_by_ids(self, account_ids: Iterable[int]) -> list[Account]:
+        """
+        Get several accounts in a single query.
+        
+        Use instead of calling get_account() in a loop. Missing IDs are
+        skipped rather than raising.
+        
+        Args:
+            account_ids: Account IDs
+        
+        Returns:
+            List of accounts ordered by account_id
+        """
+        account_ids = set(account_ids)
+        if not account_ids:
+            return []
+        return list(self.db.scalars(
+            select(Account)
+            .where(Account.account_id.in_(account_ids))
+            .order_by(Account.account_id)
+        ))
     
     def create_account(
         self,
@@ -105,11 +259,18 @@ class AccountService:
         
         Returns:
             Created account
+        
+        Raises:
+            InvalidCurrencyError: If currency is not an ISO 4217 code
         """
+        if not is_iso4217(currency):
+            raise InvalidCurrencyError(f"Unknown currency: {currency}")
+        
         if initial_balance is None:
             initial_balance = parse_money("0.00", currency)
         
         account = Account(
+            account_id=id_generator.next_id(),
             user_id=user_id,
             currency=currency.upper(),
             balance=initial_balance.to_decimal(),
@@ -117,7 +278,6 @@ class AccountService:
         )
         
         self.db.add(account)
-        self.db.flush()  # Get account_id
         
         # Create audit log
         self._create_audit_log(
@@ -141,28 +301,15 @@ class AccountService:
         Returns:
             Money object with balance
         """
-        cache_key = f"balance:{account_id}"
-        
-        if use_cache:
-            cached = cache_service.get(cache_key)
-            if cached:
-                account = self.get_account(account_id, use_cache=False)
-                return parse_money(cached, account.currency)
-        
-        account = self.get_account(account_id, use_cache=False)
-        balance = parse_money(account.balance, account.currency)
-        
-        # Cache balance
-        if use_cache:
-            cache_service.set(cache_key, str(account.balance), ttl=300)
-        
-        return balance
+        account = self.get_account_with_balance(account_id, use_cache=use_cache)
+        return parse_money(account.balance, account.currency)
     
     def update_balance(
         self,
         account_id: int,
         new_balance: Decimal,
-        old_balance: Decimal = None
+        old_balance: Decimal = None,
+        account: Optional[Account] = None
     ) -> Account:
         """
         Update account balance (with pessimistic lock).
@@ -171,11 +318,14 @@ class AccountService:
             account_id: Account ID
             new_balance: New balance
             old_balance: Old balance for audit
+            account: The account if already locked in this transaction
+                (e.g. by get_accounts_for_update); skips re-locking it
         
         Returns:
             Updated account
         """
-        account = self.get_account_for_update(account_id)
+        if account is None:
+            account = self.get_account_for_update(account_id)
         
         if old_balance is None:
             old_balance = account.balance
@@ -183,9 +333,8 @@ class AccountService:
         account.balance = new_balance
         account.version += 1  # Increment version for optimistic locking
         
-        # Invalidate cache
-        cache_service.delete(f"balance:{account_id}")
-        cache_service.delete(f"account:{account_id}")
+        # Invalidate cache once the write is committed
+        invalidate_on_commit(self.db, f"balance:{account_id}")
         
         # Create audit log
         self._create_audit_log(
@@ -204,6 +353,50 @@ class AccountService:
         
         return account
     
+    def update_balances(self, accounts: Dict[int, Account], new_balances: Dict[int, Decimal]) -> None:
+        """
+        Update several locked accounts' balances with a single UPDATE.
+        
+        Emits one `UPDATE ... SET balance = CASE account_id ...` instead of
+        one statement per account, then syncs the in-session objects.
+        
+        Args:
+            accounts: Accounts already locked in this transaction, by ID
+            new_balances: New balance per account ID
+        """
+        old_balances = {account_id: accounts[account_id].balance for account_id in new_balances}
+        
+        self.db.execute(
+            update(Account)
+            .where(Account.account_id.in_(list(new_balances)))
+            .values(
+                balance=case(new_balances, value=Account.account_id),
+                version=Account.version + 1  # For optimistic locking
+            )
+            .execution_options(synchronize_session=False)
+        )
+        
+        for account_id, new_balance in new_balances.items():
+            account = accounts[account_id]
+            set_committed_value(account, "balance", new_balance)
+            set_committed_value(account, "version", account.version + 1)
+            self.db.expire(account, ["updated_at"])
+            
+            self._create_audit_log(
+                account_id=account_id,
+                action="BALANCE_UPDATED",
+                old_balance=old_balances[account_id],
+                new_balance=new_balance
+            )
+        
+        # Invalidate cache once the write is committed
+        invalidate_on_commit(self.db, *(f"balance:{account_id}" for account_id in new_balances))
+        
+        logger.info(
+            "Balances updated",
+            balances={account_id: str(balance) for account_id, balance in new_balances.items()}
+        )
+    
     def _create_audit_log(
         self,
         account_id: int,
@@ -215,19 +408,37 @@ class AccountService:
         ip_address: str = None,
         user_agent: str = None,
         metadata: dict = None
-    ) -> AuditLog:
-        """Create audit log entry."""
-        audit_log = AuditLog(
-            account_id=account_id,
-            transaction_id=transaction_id,
-            action=action,
-            old_balance=old_balance,
-            new_balance=new_balance,
-            user_id=user_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            metadata=metadata
-        )
-        self.db.add(audit_log)
-        return audit_log
+    ) -> None:
+        """
+        Queue an audit log entry.
+        
+        Entries are written with one multi-row INSERT when the session
+        commits, rather than as an ORM object each.
+        """
+        self.db.info.setdefault(_PENDING_AUDIT_LOGS, []).append({
+            "account_id": account_id,
+            "transaction_id": transaction_id,
+            "action": action,
+            "old_balance": old_balance,
+            "new_balance": new_balance,
+            "user_id": user_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "extra_data": metadata,
+        })
+
+
+@event.listens_for(Session, "before_commit")
+def _write_audit_logs(db: Session) -> None:
+    """Insert audit log entries queued by _create_audit_log."""
+    rows = db.info.pop(_PENDING_AUDIT_LOGS, None)
+    if rows:
+        # Rows they reference (e.g. a new account) may not be flushed yet
+        db.flush()
+        db.execute(insert(AuditLog), rows)
+
 
+@event.listens_for(Session, "after_rollback")
+def _discard_audit_logs(db: Session) -> None:
+    """Forget queued audit log entries for a rolled back transaction."""
+    db.info.pop(_PENDING_AUDIT_LOGS, None)
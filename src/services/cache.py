@@ -1,46 +1,165 @@
 """Redis cache utilities."""
 
 import redis
-import json
-from typing import Optional, Any
+from redis import asyncio as aioredis
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Iterable, List, Tuple
 from decimal import Decimal
 
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
 from src.core.config import settings
 from src.core.logging import get_logger
+from src.utils.json_serialization import JSONDecodeError, json_dumps, json_loads
 
 logger = get_logger(__name__)
 
+# Sliding-window log over one sorted set per window. Admits the hit (and
+# records it in every window) only if all windows are below their limit.
+# KEYS: sorted set per window; ARGV: member, then (window_ms, limit) pairs.
+SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[i * 2])
+    local limit = tonumber(ARGV[i * 2 + 1])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        return 0
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[1])
+    redis.call('PEXPIRE', key, ARGV[i * 2])
+end
+return 1
+"""
+SLIDING_WINDOW_SHA = hashlib.sha1(SLIDING_WINDOW_LUA.encode()).hexdigest()
+
+
+class LocalCache:
+    """
+    Bounded, thread-safe in-process LRU cache with a per-entry TTL.
+    
+    A tier in front of Redis for entries that never change once written,
+    so a worker can answer repeat lookups without a network round-trip.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        """Initialize local cache."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value if cached and not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Cache a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
 
 class CacheService:
-    """Redis cache service."""
+    """
+    Redis cache service.
+    
+    After an error, reads and writes are skipped for a short cool-down
+    (a circuit breaker), so callers fall straight back to the database
+    instead of each waiting on a failing Redis. Deletes are always
+    attempted, since a skipped invalidation would leave stale data.
+    """
     
     def __init__(self):
-        """Initialize Redis connection."""
-        self.redis_client = redis.Redis(
+        """Initialize Redis connection pool."""
+        pool = redis.BlockingConnectionPool(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             db=settings.REDIS_DB,
             password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
-            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+            socket_keepalive=True,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+            # Values are handed to json_loads as raw bytes
+            decode_responses=False,
         )
+        self.redis_client = redis.Redis(connection_pool=pool)
+        self._open_until = 0.0
     
-    def get(self, key: str) -> Optional[str]:
+    def _available(self) -> bool:
+        """Whether the circuit breaker lets commands through."""
+        return time.monotonic() >= self._open_until
+    
+    def _trip(self) -> None:
+        """Open the circuit breaker after an error."""
+        self._open_until = time.monotonic() + settings.CACHE_CIRCUIT_BREAKER_SECONDS
+    
+    def get(self, key: str) -> Optional[bytes]:
         """Get value from cache."""
+        if not self._available():
+            return None
         try:
             return self.redis_client.get(key)
         except Exception as e:
+            self._trip()
             logger.error("Cache get error", key=key, error=str(e))
             return None
     
+    def get_strict(self, key: str) -> Optional[bytes]:
+        """
+        Get value from cache, raising on errors instead of reporting a miss.
+        
+        For callers that act differently on a real miss than on an
+        unreachable cache.
+        
+        Raises:
+            redis.RedisError: If the command fails or the circuit breaker
+                is open
+        """
+        if not self._available():
+            raise redis.ConnectionError("Cache circuit breaker open")
+        try:
+            return self.redis_client.get(key)
+        except redis.RedisError:
+            self._trip()
+            raise
+    
     def set(self, key: str, value: Any, ttl: int = 300) -> bool:
         """Set value in cache with TTL."""
+        if not self._available():
+            return False
         try:
             if isinstance(value, (Decimal, float, int)):
                 value = str(value)
             elif isinstance(value, (dict, list)):
-                value = json.dumps(value)
+                value = json_dumps(value)
             return self.redis_client.setex(key, ttl, value)
         except Exception as e:
+            self._trip()
             logger.error("Cache set error", key=key, error=str(e))
             return False
     
@@ -52,11 +171,29 @@ class CacheService:
             logger.error("Cache delete error", key=key, error=str(e))
             return False
     
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete several keys in one round-trip.
+        
+        Uses UNLINK, so Redis frees the values off its main thread.
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        try:
+            return self.redis_client.unlink(*keys)
+        except Exception as e:
+            logger.error("Cache delete error", keys=keys, error=str(e))
+            return 0
+    
     def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
+        if not self._available():
+            return False
         try:
             return bool(self.redis_client.exists(key))
         except Exception as e:
+            self._trip()
             logger.error("Cache exists error", key=key, error=str(e))
             return False
     
@@ -65,16 +202,169 @@ class CacheService:
         value = self.get(key)
         if value:
             try:
-                return json.loads(value)
-            except json.JSONDecodeError:
+                return json_loads(value)
+            except JSONDecodeError:
                 return None
         return None
     
     def set_json(self, key: str, value: dict, ttl: int = 300) -> bool:
-        """Set JSON value in cache."""
-        return self.set(key, json.dumps(value), ttl)
+        """Set JSON value in cache (Decimals are stored as strings)."""
+        return self.set(key, json_dumps(value), ttl)
+    
+    def set_json_if_absent(self, key: str, value: dict, ttl: int = 300) -> bool:
+        """
+        Set JSON value only if the key doesn't exist (SET NX EX).
+        
+        Atomic in Redis, so of several concurrent writers exactly one wins.
+        
+        Returns:
+            True if the value was stored, False if the key existed or on error
+        """
+        if not self._available():
+            return False
+        try:
+            return bool(self.redis_client.set(key, json_dumps(value), ex=ttl, nx=True))
+        except Exception as e:
+            self._trip()
+            logger.error("Cache set error", key=key, error=str(e))
+            return False
+    
+    def set_json_many(
+        self,
+        items: Iterable[Tuple[str, dict]],
+        ttl: int = 300,
+        if_absent: bool = False
+    ) -> bool:
+        """
+        Set several JSON values in one round-trip.
+        
+        Args:
+            items: (key, value) pairs
+            ttl: Time to live in seconds
+            if_absent: Leave existing keys untouched (SET NX)
+        """
+        if not self._available():
+            return False
+        try:
+            with self.pipeline() as pipe:
+                for key, value in items:
+                    pipe.set(key, json_dumps(value), ex=ttl, nx=if_absent)
+                pipe.execute()
+            return True
+        except Exception as e:
+            self._trip()
+            logger.error("Cache set error", error=str(e))
+            return False
+    
+    def pipeline(self) -> redis.client.Pipeline:
+        """
+        Get a non-transactional pipeline for batching commands.
+        
+        Commands are queued locally and sent in one round-trip on execute().
+        """
+        return self.redis_client.pipeline(transaction=False)
+
+
+# session.info key holding cache keys to drop once the transaction commits
+_PENDING_INVALIDATIONS = "cache_invalidations"
+
+
+def invalidate_on_commit(db: Session, *keys: str) -> None:
+    """
+    Invalidate cache keys when the session's transaction commits.
+    
+    Deleting before the commit would let a concurrent read re-cache the
+    old row; deleting after it means readers only ever re-cache committed
+    data. Keys are dropped without invalidation if the transaction rolls back.
+    
+    Args:
+        db: Session performing the write
+        keys: Cache keys made stale by the write
+    """
+    db.info.setdefault(_PENDING_INVALIDATIONS, set()).update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(db: Session) -> None:
+    """Delete cache keys queued by invalidate_on_commit."""
+    keys = db.info.pop(_PENDING_INVALIDATIONS, None)
+    if keys:
+        cache_service.delete_many(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(db: Session) -> None:
+    """Forget queued invalidations for a rolled back transaction."""
+    db.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+class AsyncCacheService:
+    """
+    Async Redis cache service for use on the event loop.
+    
+    For middleware and `async def` handlers. Sync endpoints run in the
+    threadpool and use CacheService, which doesn't block the loop there.
+    """
+    
+    def __init__(self):
+        """Initialize async Redis connection."""
+        self.redis_client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_keepalive=True,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+            decode_responses=False,
+        )
+    
+    async def sliding_window_hit(
+        self,
+        windows: List[Tuple[str, int, int]],
+        member: str
+    ) -> Optional[bool]:
+        """
+        Record a hit against sliding-window limits, atomically.
+        
+        Args:
+            windows: List of (key, window_seconds, limit) tuples
+            member: Unique identifier for this hit
+        
+        Returns:
+            True if the hit is within all limits, False if any limit is
+            exceeded, or None on cache error
+        """
+        keys = [key for key, _, _ in windows]
+        args = [member]
+        for _, window, limit in windows:
+            args.extend((window * 1000, limit))
+        
+        try:
+            try:
+                allowed = await self.redis_client.evalsha(SLIDING_WINDOW_SHA, len(keys), *keys, *args)
+            except redis.exceptions.NoScriptError:
+                # Script cache was flushed (e.g. Redis restart) - reload and retry once
+                await self.load_scripts()
+                allowed = await self.redis_client.evalsha(SLIDING_WINDOW_SHA, len(keys), *keys, *args)
+            return bool(allowed)
+        except Exception as e:
+            logger.error("Cache sliding window error", keys=keys, error=str(e))
+            return None
+    
+    async def load_scripts(self) -> None:
+        """Preload Lua scripts so hot paths can call EVALSHA."""
+        try:
+            await self.redis_client.script_load(SLIDING_WINDOW_LUA)
+        except Exception as e:
+            logger.error("Cache script load error", error=str(e))
+    
+    async def close(self) -> None:
+        """Close the connection pool."""
+        await self.redis_client.aclose()
 
 
-# Global cache instance
+# Global cache instances
 cache_service = CacheService()
+async_cache_service = AsyncCacheService()
 
@@ -1,18 +1,36 @@
 """Idempotency service for preventing duplicate transactions."""
 
-import json
 import hashlib
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 
+import redis
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.orm import Session
 from src.db.models import IdempotencyKey, Transaction
-from src.services.cache import cache_service
+from src.services.cache import LocalCache, cache_service
 from src.core.config import settings
 from src.core.logging import get_logger
+from src.utils.json_serialization import JSONDecodeError, json_dumps, json_loads
+from src.utils.metrics import db_query_duration, measure_time
 
 logger = get_logger(__name__)
 
+_KEY_TTL = timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+
+# Redis value recording a recent miss; not valid JSON, so it can't collide
+# with a stored response
+_MISS = b"\x00MISS"
+
+# Whether the last Redis lookup failed; only state changes are logged
+_cache_degraded = False
+
+# Responses for committed keys never change, so each worker keeps recent ones
+_local_cache = LocalCache(
+    settings.IDEMPOTENCY_LOCAL_CACHE_SIZE,
+    settings.IDEMPOTENCY_LOCAL_CACHE_TTL_SECONDS
+)
+
 
 class IdempotencyService:
     """Service for handling idempotency keys."""
@@ -20,7 +38,9 @@ class IdempotencyService:
     def __init__(self, db: Session):
         """Initialize idempotency service."""
         self.db = db
+        self._pending_cache: List[Tuple[str, Dict[str, Any]]] = []
     
+    @measure_time(db_query_duration)
     def check_idempotency(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
         """
         Check if idempotency key exists and return cached response.
@@ -28,22 +48,56 @@ class IdempotencyService:
         Returns:
             Cached response if exists, None otherwise
         """
-        # Fast path: Check Redis cache
         cache_key = f"idempotency:{idempotency_key}"
-        cached_response = cache_service.get_json(cache_key)
-        if cached_response:
-            logger.info("Idempotency cache hit", idempotency_key=idempotency_key[:8])
+        
+        # Fastest path: Check in-process cache
+        cached_response = _local_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info("Idempotency local cache hit", idempotency_key=idempotency_key[:8])
             return cached_response
         
+        # Fast path: Check Redis cache
+        global _cache_degraded
+        try:
+            raw = cache_service.get_strict(cache_key)
+        except redis.RedisError as e:
+            raw = None
+            if not _cache_degraded:
+                _cache_degraded = True
+                logger.warning("Idempotency cache unavailable, checking database", error=str(e))
+        else:
+            if _cache_degraded:
+                _cache_degraded = False
+                logger.info("Idempotency cache available again")
+            if raw is None and settings.IDEMPOTENCY_CACHE_AUTHORITATIVE:
+                return None
+        
+        if raw == _MISS:
+            # Recently looked up and not found
+            return None
+        if raw:
+            try:
+                cached_response = json_loads(raw)
+            except JSONDecodeError:
+                cached_response = None
+            if cached_response:
+                _local_cache.set(cache_key, cached_response)
+                logger.info("Idempotency cache hit", idempotency_key=idempotency_key[:8])
+                return cached_response
+        
         # Slow path: Check database
-        db_key = self.db.query(IdempotencyKey).filter(
-            IdempotencyKey.idempotency_key == idempotency_key,
-            IdempotencyKey.expires_at > datetime.utcnow()
-        ).first()
+        db_key = self.db.execute(
+            lambda_stmt(lambda: select(IdempotencyKey).where(
+                IdempotencyKey.idempotency_key == idempotency_key,
+                # Compare against the database clock, like the server-side created_at
+                IdempotencyKey.expires_at > func.current_timestamp()
+            ))
+        ).scalar_one_or_none()
         
         if db_key and db_key.response_data:
-            # Refresh cache
-            cache_service.set_json(
+            # Refresh caches
+            _local_cache.set(cache_key, db_key.response_data)
+            cache_service.set_json_if_absent(
                 cache_key,
                 db_key.response_data,
                 ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS
@@ -51,6 +105,9 @@ class IdempotencyService:
             logger.info("Idempotency DB hit", idempotency_key=idempotency_key[:8])
             return db_key.response_data
         
+        # Absorb retries of this key until the original request's
+        # warm_cache() overwrites the marker
+        cache_service.set(cache_key, _MISS, ttl=settings.IDEMPOTENCY_MISS_TTL_SECONDS)
         return None
     
     def store_idempotency(
@@ -69,7 +126,7 @@ class IdempotencyService:
             response_data: Response data to cache
             request_hash: Optional hash of request for validation
         """
-        expires_at = datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+        expires_at = datetime.utcnow() + _KEY_TTL
         
         # Store in database
         idempotency_record = IdempotencyKey(
@@ -81,20 +138,39 @@ class IdempotencyService:
         )
         self.db.add(idempotency_record)
         
-        # Store in cache
-        cache_key = f"idempotency:{idempotency_key}"
-        cache_service.set_json(
-            cache_key,
-            response_data,
-            ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS
-        )
+        # Cache only once committed (see warm_cache); the DB record is the
+        # source of truth until then
+        self._pending_cache.append((f"idempotency:{idempotency_key}", response_data))
         
         logger.info("Idempotency stored", idempotency_key=idempotency_key[:8], transaction_id=transaction_id)
     
+    def warm_cache(self) -> None:
+        """
+        Write stored responses to the cache.
+        
+        Call after the transaction has committed. Safe to run after the
+        response has been sent: a cache miss falls back to the database.
+        """
+        pending, self._pending_cache = self._pending_cache, []
+        for cache_key, response_data in pending:
+            _local_cache.set(cache_key, response_data)
+        if pending:
+            # Plain SET, so a miss marker left by check_idempotency() is
+            # replaced. Each key is stored by at most one committed request.
+            cache_service.set_json_many(pending, ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+    
     @staticmethod
     def generate_request_hash(request_data: Dict[str, Any]) -> str:
-        """Generate hash from request data for validation."""
+        """
+        Generate hash from request data for validation.
+        
+        Only detects a reused key with a different body, so it needs no
+        cryptographic strength: a 128-bit BLAKE2b digest of the canonical
+        JSON is plenty and cheaper than SHA-256.
+        
+        Returns:
+            32-character hex digest
+        """
         # Sort keys for consistent hashing
-        sorted_data = json.dumps(request_data, sort_keys=True)
-        return hashlib.sha256(sorted_data.encode()).hexdigest()
-
+        canonical = json_dumps(request_data, sort_keys=True)
+        return hashlib.blake2b(canonical, digest_size=16).hexdigest()
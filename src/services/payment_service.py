@@ -1,8 +1,11 @@
 """Payment service for handling money transfers."""
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, lambda_stmt, select, tuple_, union_all
+from sqlalchemy.sql import Subquery
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, joinedload
 from decimal import Decimal
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import datetime
 
 from src.db.models import (
@@ -18,11 +21,31 @@ from src.core.exceptions import (
     AccountSuspendedError
 )
 from src.core.logging import get_logger
+from src.db.database import upsert_insert
 from src.services.account_service import AccountService
 from src.services.idempotency import IdempotencyService
+from src.services.cache import invalidate_on_commit
+from src.utils.metrics import db_query_duration, measure_time
 
 logger = get_logger(__name__)
 
+# Status stored in idempotent transfer responses
+_STATUS_COMPLETED = TransactionStatus.COMPLETED.value
+
+# Columns returned by transaction history listings
+_HISTORY_COLUMNS = (
+    Transaction.transaction_id,
+    Transaction.from_account_id,
+    Transaction.to_account_id,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.transaction_type,
+    Transaction.status,
+    Transaction.description,
+    Transaction.created_at,
+    Transaction.completed_at,
+)
+
 
 class PaymentService:
     """Service for payment operations."""
@@ -33,6 +56,25 @@ class PaymentService:
         self.account_service = AccountService(db)
         self.idempotency_service = IdempotencyService(db)
     
+    def commit(self) -> None:
+        """
+        Commit the unit of work.
+        
+        All writes made through this service (and its account and
+        idempotency services) share one session and are committed together
+        with a single round-trip.
+        """
+        self.db.commit()
+    
+    def warm_caches(self) -> None:
+        """
+        Populate caches for work committed by commit().
+        
+        Not needed for correctness, so endpoints run it as a background
+        task after the response is sent.
+        """
+        self.idempotency_service.warm_cache()
+    
     def transfer_money(
         self,
         from_account_id: int,
@@ -73,9 +115,7 @@ class PaymentService:
         if cached_response:
             transaction_id = cached_response.get("transaction_id")
             if transaction_id:
-                transaction = self.db.query(Transaction).filter(
-                    Transaction.transaction_id == transaction_id
-                ).first()
+                transaction = self.get_transaction(transaction_id)
                 if transaction:
                     logger.info("Duplicate transaction prevented", idempotency_key=idempotency_key[:8])
                     raise DuplicateTransactionError(f"Transaction already processed: {transaction_id}")
@@ -84,9 +124,11 @@ class PaymentService:
         if amount.is_zero() or not amount.is_positive():
             raise InvalidAmountError("Amount must be positive")
         
-        # Validate accounts exist and are active (with pessimistic lock)
-        from_account = self.account_service.get_account_for_update(from_account_id)
-        to_account = self.account_service.get_account_for_update(to_account_id)
+        # Validate accounts exist and are active (with pessimistic locks,
+        # taken in one query in a deterministic order)
+        accounts = self.account_service.get_accounts_for_update([from_account_id, to_account_id])
+        from_account = accounts[from_account_id]
+        to_account = accounts[to_account_id]
         
         # Validate currencies match
         if from_account.currency != amount.currency:
@@ -98,44 +140,53 @@ class PaymentService:
                 f"To account currency {to_account.currency} != amount currency {amount.currency}"
             )
         
-        # Check sufficient funds
-        from_balance = parse_money(from_account.balance, from_account.currency)
-        if from_balance < amount:
+        # Check sufficient funds. Currencies already match, so work on the
+        # Decimal balances directly.
+        delta = amount.amount
+        if from_account.balance < delta:
             raise InsufficientFundsError(
-                f"Insufficient funds: balance={from_balance}, required={amount}"
+                f"Insufficient funds: balance={from_account.balance} {from_account.currency}, "
+                f"required={amount}"
             )
         
         # Calculate new balances
-        new_from_balance = (from_balance - amount).to_decimal()
-        new_to_balance = parse_money(to_account.balance, to_account.currency)
-        new_to_balance = (new_to_balance + amount).to_decimal()
+        new_from_balance = from_account.balance - delta
+        new_to_balance = to_account.balance + delta
         
-        # Create transaction record
-        transaction = Transaction(
-            from_account_id=from_account_id,
-            to_account_id=to_account_id,
-            amount=amount.to_decimal(),
-            currency=amount.currency,
-            transaction_type=TransactionType.TRANSFER,
-            status=TransactionStatus.PENDING,
-            idempotency_key=idempotency_key,
-            reference_id=reference_id,
-            description=description
-        )
-        self.db.add(transaction)
-        self.db.flush()  # Get transaction_id
+        # Create transaction record. The unique index on idempotency_key
+        # arbitrates concurrent retries in the same round-trip as the insert.
+        transaction = self.db.scalars(
+            upsert_insert(self.db, Transaction)
+            .values(
+                from_account_id=from_account_id,
+                to_account_id=to_account_id,
+                amount=delta,
+                currency=amount.currency,
+                transaction_type=TransactionType.TRANSFER,
+                status=TransactionStatus.PENDING,
+                idempotency_key=idempotency_key,
+                reference_id=reference_id,
+                description=description
+            )
+            .on_conflict_do_nothing(index_elements=[Transaction.idempotency_key])
+            .returning(Transaction)
+        ).one_or_none()
+        if transaction is None:
+            existing_id = self.db.scalar(
+                lambda_stmt(lambda: select(Transaction.transaction_id)
+                    .where(Transaction.idempotency_key == idempotency_key))
+            )
+            logger.info("Duplicate transaction prevented", idempotency_key=idempotency_key[:8])
+            raise DuplicateTransactionError(f"Transaction already processed: {existing_id}")
+        
+        old_from_balance = from_account.balance
+        old_to_balance = to_account.balance
         
         try:
-            # Update balances
-            self.account_service.update_balance(
-                from_account_id,
-                new_from_balance,
-                old_balance=from_account.balance
-            )
-            self.account_service.update_balance(
-                to_account_id,
-                new_to_balance,
-                old_balance=to_account.balance
+            # Update both balances in one statement
+            self.account_service.update_balances(
+                accounts,
+                {from_account_id: new_from_balance, to_account_id: new_to_balance}
             )
             
             # Create double-entry bookkeeping entries
@@ -149,7 +200,7 @@ class PaymentService:
             self.account_service._create_audit_log(
                 account_id=from_account_id,
                 action="TRANSFER_DEBIT",
-                old_balance=from_account.balance,
+                old_balance=old_from_balance,
                 new_balance=new_from_balance,
                 transaction_id=transaction.transaction_id,
                 user_id=user_id,
@@ -159,7 +210,7 @@ class PaymentService:
             self.account_service._create_audit_log(
                 account_id=to_account_id,
                 action="TRANSFER_CREDIT",
-                old_balance=to_account.balance,
+                old_balance=old_to_balance,
                 new_balance=new_to_balance,
                 transaction_id=transaction.transaction_id,
                 user_id=user_id,
@@ -170,8 +221,8 @@ class PaymentService:
             # Store idempotency key
             response_data = {
                 "transaction_id": transaction.transaction_id,
-                "status": transaction.status.value,
-                "amount": str(amount.amount),
+                "status": _STATUS_COMPLETED,
+                "amount": format(delta, "f"),
                 "currency": amount.currency
             }
             self.idempotency_service.store_idempotency(
@@ -189,7 +240,7 @@ class PaymentService:
             )
             
             return transaction
-            
+        
         except Exception as e:
             # Mark transaction as failed
             transaction.status = TransactionStatus.FAILED
@@ -207,53 +258,115 @@ class PaymentService:
         to_account_id: int,
         amount: Money
     ) -> None:
-        """Create double-entry bookkeeping entries."""
-        # Debit entry (money leaving source)
-        debit_entry = TransactionEntry(
-            transaction_id=transaction.transaction_id,
-            account_id=from_account_id,
-            entry_type=EntryType.DEBIT,
-            amount=amount.to_decimal(),
-            currency=amount.currency
-        )
-        self.db.add(debit_entry)
-        
-        # Credit entry (money entering destination)
-        credit_entry = TransactionEntry(
-            transaction_id=transaction.transaction_id,
-            account_id=to_account_id,
-            entry_type=EntryType.CREDIT,
-            amount=amount.to_decimal(),
-            currency=amount.currency
-        )
-        self.db.add(credit_entry)
+        """Create double-entry bookkeeping entries (one multi-row INSERT)."""
+        entry = {
+            "transaction_id": transaction.transaction_id,
+            "amount": amount.to_decimal(),
+            "currency": amount.currency,
+        }
+        self.db.execute(insert(TransactionEntry), [
+            # Debit entry (money leaving source)
+            {**entry, "account_id": from_account_id, "entry_type": EntryType.DEBIT},
+            # Credit entry (money entering destination)
+            {**entry, "account_id": to_account_id, "entry_type": EntryType.CREDIT},
+        ])
     
+    @measure_time(db_query_duration)
     def get_transaction(self, transaction_id: int) -> Optional[Transaction]:
         """Get transaction by ID."""
-        return self.db.query(Transaction).filter(
-            Transaction.transaction_id == transaction_id
-        ).first()
+        return self.db.execute(
+            lambda_stmt(lambda: select(Transaction).where(Transaction.transaction_id == transaction_id))
+        ).scalar_one_or_none()
+    
+    def get_transaction_with_accounts(self, transaction_id: int) -> Optional[Transaction]:
+        """
+        Get transaction by ID with both accounts loaded in the same query.
+        
+        For read-only access checks. Don't use on write paths: the joined
+        Account rows are loaded without a lock, and a later
+        get_account_for_update() would return those cached objects.
+        
+        Args:
+            transaction_id: Transaction ID
+        
+        Returns:
+            Transaction with from_account and to_account loaded, or None
+        """
+        return self.db.execute(
+            lambda_stmt(lambda: select(Transaction)
+                .options(joinedload(Transaction.from_account), joinedload(Transaction.to_account))
+                .where(Transaction.transaction_id == transaction_id))
+        ).unique().scalar_one_or_none()
     
     def get_account_transactions(
         self,
         account_id: int,
         limit: int = 50,
-        offset: int = 0,
+        before: Optional[Tuple[datetime, int]] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
-    ) -> list[Transaction]:
-        """Get transaction history for an account."""
-        query = self.db.query(Transaction).filter(
-            (Transaction.from_account_id == account_id) |
-            (Transaction.to_account_id == account_id)
-        )
+    ) -> Tuple[list[Row], bool]:
+        """
+        Get a page of transaction history for an account (keyset pagination).
         
+        Returns plain column rows rather than Transaction objects, so the
+        read-only listing skips ORM instantiation and the identity map.
+        
+        Args:
+            account_id: Account ID
+            limit: Page size
+            before: Keyset position (created_at, transaction_id) of the last
+                row of the previous page; only older transactions are returned
+            start_date: Optional lower bound on created_at
+            end_date: Optional upper bound on created_at
+        
+        Returns:
+            Tuple of (transaction rows newest first, whether more pages exist)
+        """
+        filters = []
+        if before is not None:
+            filters.append(tuple_(Transaction.created_at, Transaction.transaction_id) < before)
         if start_date:
-            query = query.filter(Transaction.created_at >= start_date)
+            filters.append(Transaction.created_at >= start_date)
         if end_date:
-            query = query.filter(Transaction.created_at <= end_date)
+            filters.append(Transaction.created_at <= end_date)
         
-        return query.order_by(Transaction.created_at.desc()).limit(limit).offset(offset).all()
+        # One branch per side of the transfer instead of an OR, so each is
+        # an ordered, limited scan of its own (account_id, created_at DESC)
+        # index. Self-transfers are only taken from the outgoing branch.
+        # Each branch fetches one extra row to find out whether there is a
+        # next page.
+        outgoing = self._history_page(
+            limit + 1, Transaction.from_account_id == account_id, *filters
+        )
+        incoming = self._history_page(
+            limit + 1,
+            Transaction.to_account_id == account_id,
+            # NULL-safe: deposits have no source account
+            Transaction.from_account_id.is_distinct_from(account_id),
+            *filters
+        )
+        history = union_all(select(outgoing), select(incoming)).subquery()
+        
+        transactions = self.db.execute(
+            select(history).order_by(
+                history.c.created_at.desc(),
+                history.c.transaction_id.desc()
+            ).limit(limit + 1)
+        ).all()
+        has_more = len(transactions) > limit
+        return transactions[:limit], has_more
+    
+    @staticmethod
+    def _history_page(limit: int, *criteria) -> Subquery:
+        """Newest-first, limited history rows matching criteria."""
+        return (
+            select(*_HISTORY_COLUMNS)
+            .where(*criteria)
+            .order_by(Transaction.created_at.desc(), Transaction.transaction_id.desc())
+            .limit(limit)
+            .subquery()
+        )
     
     def reverse_transaction(
         self,
@@ -294,6 +407,7 @@ class PaymentService:
         
         reversal.transaction_type = TransactionType.REVERSAL
         original_transaction.status = TransactionStatus.REVERSED
+        invalidate_on_commit(self.db, f"transaction:{transaction_id}")
         
         logger.info("Transaction reversed", original_transaction_id=transaction_id, reversal_id=reversal.transaction_id)
         
@@ -0,0 +1,214 @@
+"""Client-side, time-ordered 64-bit ID generation."""
+
+import os
+import random
+import socket
+import threading
+import time
+from typing import Optional
+
+import redis
+
+from src.core.config import settings
+from src.core.logging import get_logger
+from src.services.cache import cache_service
+
+logger = get_logger(__name__)
+
+# Custom epoch (2024-01-01T00:00:00Z) in milliseconds
+EPOCH_MS = 1704067200000
+
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Redis key holding the lease on a worker ID
+_LEASE_KEY = "snowflake:worker:{}"
+
+# Extend our lease, or take the key back if it expired; 0 if someone else
+# holds it
+_RENEW_LEASE = """
+local owner = redis.call('GET', KEYS[1])
+if owner == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+elseif not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class WorkerIdLease:
+    """
+    Worker ID leased from Redis, unique across processes and hosts.
+    
+    A free ID is claimed with SET NX EX and kept alive by a daemon thread
+    that renews it every third of the lease. The ID is only used while the
+    lease is known to be held: if renewals fail for a whole lease period
+    (after which another process could claim it), or the key turns out to
+    belong to someone else, a new ID is leased on the next call.
+    """
+    
+    def __init__(self, lease_seconds: int):
+        """Initialize lease."""
+        self.lease_seconds = lease_seconds
+        self._token = f"{socket.gethostname()}:{os.getpid()}"
+        self._worker_id: Optional[int] = None
+        self._held_until = 0.0
+        self._generation = 0
+    
+    def get(self) -> int:
+        """
+        Get the leased worker ID, leasing a new one if the lease lapsed.
+        
+        Raises:
+            RuntimeError: If Redis is unreachable or every ID is taken
+        """
+        if self._worker_id is None or time.monotonic() >= self._held_until:
+            return self._acquire()
+        return self._worker_id
+    
+    def _acquire(self) -> int:
+        """Claim a free worker ID and start renewing it."""
+        client = cache_service.redis_client
+        start = random.randrange(MAX_WORKER_ID + 1)
+        worker_id = None
+        try:
+            for offset in range(MAX_WORKER_ID + 1):
+                candidate = (start + offset) & MAX_WORKER_ID
+                if client.set(_LEASE_KEY.format(candidate), self._token, ex=self.lease_seconds, nx=True):
+                    worker_id = candidate
+                    break
+        except redis.RedisError as e:
+            raise RuntimeError(f"Cannot lease a Snowflake worker ID: {e}") from e
+        if worker_id is None:
+            raise RuntimeError("No free Snowflake worker IDs")
+        
+        # Retire the previous lease's renewal thread
+        self._generation += 1
+        self._worker_id = worker_id
+        self._held_until = time.monotonic() + self.lease_seconds
+        threading.Thread(
+            target=self._renew_forever,
+            args=(client, worker_id, self._generation),
+            name="snowflake-lease",
+            daemon=True
+        ).start()
+        logger.info("Leased Snowflake worker ID", worker_id=worker_id)
+        return worker_id
+    
+    def _renew_forever(self, client: redis.Redis, worker_id: int, generation: int) -> None:
+        """Renew the lease until it is lost or replaced."""
+        renew = client.register_script(_RENEW_LEASE)
+        key = _LEASE_KEY.format(worker_id)
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            if self._generation != generation:
+                return
+            renewed_at = time.monotonic()
+            try:
+                held = renew(keys=[key], args=[self._token, self.lease_seconds])
+            except redis.RedisError as e:
+                # Still ours until _held_until; retry next round
+                logger.error("Snowflake lease renewal failed", worker_id=worker_id, error=str(e))
+                continue
+            if self._generation != generation:
+                return
+            if not held:
+                logger.error("Snowflake worker ID lease lost", worker_id=worker_id)
+                self._held_until = 0.0
+                return
+            self._held_until = renewed_at + self.lease_seconds
+
+
+class SnowflakeGenerator:
+    """
+    Snowflake-style ID generator.
+    
+    IDs are (milliseconds since EPOCH_MS << 22 | worker << 12 | sequence),
+    so they increase over time and primary keys can be assigned before the
+    INSERT instead of read back from a database sequence. The worker ID
+    must be unique among all live processes, or two of them can mint the
+    same ID in the same millisecond.
+    """
+    
+    def __init__(self, worker_id: Optional[int] = None, lease_seconds: int = 60):
+        """
+        Initialize generator.
+        
+        Args:
+            worker_id: Unique ID of this process (0-1023). If None, an ID is
+                leased from Redis the first time one is needed in each
+                process.
+            lease_seconds: Redis lease TTL when worker_id is None
+        """
+        if worker_id is not None and not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self._configured_worker_id = worker_id
+        self._lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._reset()
+    
+    def _reset(self) -> None:
+        """Reset state for the current process."""
+        self._pid = os.getpid()
+        self._lease = None if self._configured_worker_id is not None else WorkerIdLease(self._lease_seconds)
+        self._last_ms = -1
+        self._sequence = 0
+    
+    @property
+    def worker_id(self) -> int:
+        """
+        This process's worker ID, leasing one if needed.
+        
+        Raises:
+            RuntimeError: If no worker ID can be leased
+        """
+        with self._lock:
+            return self._worker_id()
+    
+    def _worker_id(self) -> int:
+        """Worker ID; call with the lock held."""
+        if os.getpid() != self._pid:
+            # Forked worker - don't share the parent's worker ID
+            self._reset()
+        if self._lease is None:
+            return self._configured_worker_id
+        return self._lease.get()
+    
+    def next_id(self) -> int:
+        """
+        Generate the next ID.
+        
+        Returns:
+            Positive 63-bit integer
+        """
+        with self._lock:
+            worker_id = self._worker_id()
+            
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms < self._last_ms:
+                # Clock moved backwards; keep IDs monotonic
+                now_ms = self._last_ms
+            
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond
+                    while now_ms <= self._last_ms:
+                        now_ms = time.time_ns() // 1_000_000
+            else:
+                self._sequence = 0
+            
+            self._last_ms = now_ms
+            return (
+                ((now_ms - EPOCH_MS) << (WORKER_BITS + SEQUENCE_BITS))
+                | (worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+
+# Global ID generator
+id_generator = SnowflakeGenerator(settings.ID_WORKER_ID, settings.ID_WORKER_LEASE_SECONDS)
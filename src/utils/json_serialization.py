@@ -0,0 +1,47 @@
+"""JSON serialization backed by orjson."""
+
+from typing import Any
+
+import orjson
+
+# Naive datetimes are UTC throughout the app; render them with a "Z" suffix
+_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    Serialize an object to JSON bytes.
+    
+    Types orjson doesn't handle natively (e.g. Decimal) fall back to str().
+    
+    Args:
+        obj: Object to serialize
+        sort_keys: Sort dict keys, for canonical output (e.g. hashing)
+    
+    Returns:
+        UTF-8 encoded JSON
+    """
+    option = _OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else _OPTIONS
+    return orjson.dumps(obj, default=str, option=option)
+
+
+def json_dumps_text(obj: Any) -> str:
+    """
+    Serialize an object to a JSON str.
+    
+    For APIs that need text rather than bytes, such as the engine's
+    json_serializer for JSON columns.
+    """
+    return json_dumps(obj).decode()
+
+
+def json_loads(data: Any) -> Any:
+    """
+    Deserialize JSON from bytes or str.
+    
+    Raises:
+        JSONDecodeError: If the data is not valid JSON
+    """
+    return orjson.loads(data)
@@ -1,7 +1,10 @@
 """Metrics and monitoring utilities."""
 
 from prometheus_client import Counter, Histogram, Gauge
+from collections import defaultdict
+from contextvars import ContextVar
 from functools import wraps
+from typing import Any, DefaultDict, Dict, Optional, Tuple
 import time
 
 # Transaction metrics
@@ -61,40 +64,104 @@ cache_hits_total = Counter('cache_hits_total', 'Total cache hits')
 cache_misses_total = Counter('cache_misses_total', 'Total cache misses')
 
 
+# Labelled children by (metric, label values); labels() is a locked dict
+# lookup on every call
+_children: Dict[Tuple[Any, Tuple[str, ...]], Any] = {}
+
+
+def _child(metric: Any, *label_values: str) -> Any:
+    """Get the labelled child of a metric, memoized."""
+    key = (metric, label_values)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*label_values)
+    return child
+
+
+class _MetricAggregator:
+    """
+    Per-request buffer of counter increments.
+    
+    Between start() and flush(), incr() only adds to a dict in the current
+    context, and flush() applies each counter's total with a single inc().
+    Outside a request, incr() increments the counter directly. The buffer
+    is a mutable dict, so sync endpoints running in the threadpool (which
+    get a copy of the request's context) add to the same buffer.
+    """
+    
+    def __init__(self):
+        """Initialize aggregator."""
+        self._pending: ContextVar[Optional[DefaultDict[Any, float]]] = ContextVar(
+            "metric_increments", default=None
+        )
+    
+    def start(self) -> Any:
+        """
+        Start buffering increments in the current context.
+        
+        Returns:
+            Token to pass to flush()
+        """
+        return self._pending.set(defaultdict(int))
+    
+    def incr(self, counter: Any, n: float = 1) -> None:
+        """Increment a counter (or labelled child) by n."""
+        pending = self._pending.get()
+        if pending is None:
+            counter.inc(n)
+        else:
+            pending[counter] += n
+    
+    def flush(self, token: Any) -> None:
+        """Apply buffered increments and stop buffering."""
+        pending = self._pending.get()
+        self._pending.reset(token)
+        if pending:
+            for counter, n in pending.items():
+                counter.inc(n)
+
+
+metric_aggregator = _MetricAggregator()
+
+
 def track_transaction(transaction_type: str, status: str, amount: float = None):
     """Track transaction metrics."""
-    transactions_total.labels(type=transaction_type, status=status).inc()
+    metric_aggregator.incr(_child(transactions_total, transaction_type, status))
     if amount is not None:
         transaction_amount.observe(amount)
 
 
 def track_api_request(method: str, endpoint: str, status_code: int, duration: float):
     """Track API request metrics."""
-    api_requests_total.labels(method=method, endpoint=endpoint, status=str(status_code)).inc()
-    api_request_duration.labels(method=method, endpoint=endpoint).observe(duration)
+    metric_aggregator.incr(_child(api_requests_total, method, endpoint, str(status_code)))
+    _child(api_request_duration, method, endpoint).observe(duration)
 
 
 def track_cache_hit():
     """Track cache hit."""
-    cache_hits_total.inc()
+    metric_aggregator.incr(cache_hits_total)
 
 
 def track_cache_miss():
     """Track cache miss."""
-    cache_misses_total.inc()
-
-
-def measure_time(func):
-    """Decorator to measure function execution time."""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start = time.time()
-        try:
-            result = func(*args, **kwargs)
-            return result
-        finally:
-            duration = time.time() - start
-            # Log or track duration as needed
-            pass
-    return wrapper
-
+    metric_aggregator.incr(cache_misses_total)
+
+
+def measure_time(histogram: Any):
+    """
+    Decorator that observes a function's execution time.
+    
+    Args:
+        histogram: Histogram (or labelled child) to observe the duration in
+            seconds into
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe((time.perf_counter_ns() - start) / 1e9)
+        return wrapper
+    return decorator
@@ -0,0 +1,47 @@
+"""Keyset pagination cursors."""
+
+import base64
+from datetime import datetime
+from typing import Tuple
+
+import orjson
+
+
+def encode_cursor(created_at: datetime, transaction_id: int) -> str:
+    """
+    Encode a keyset position as an opaque cursor.
+    
+    Args:
+        created_at: Creation time of the last row on the page
+        transaction_id: ID of the last row on the page
+    
+    Returns:
+        URL-safe cursor string
+    """
+    raw = orjson.dumps([created_at.isoformat(), transaction_id])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Cursor string
+    
+    Returns:
+        Tuple of (created_at, transaction_id)
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, transaction_id = orjson.loads(raw)
+        created_at = datetime.fromisoformat(created_at)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    
+    if not isinstance(transaction_id, int):
+        raise ValueError("Invalid cursor")
+    return created_at, transaction_id
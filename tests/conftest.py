@@ -1,32 +1,76 @@
 """Pytest configuration and fixtures."""
 
+import os
+
+# Tests run without Redis, so use a fixed Snowflake worker ID rather than a
+# leased one; must be set before the settings are loaded
+os.environ.setdefault("ID_WORKER_ID", "1")
+
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
 from src.db.database import Base, get_db
+from src.services import cache, idempotency
 from src.main import app
 from src.core.config import settings
+from src.utils.json_serialization import json_dumps_text, json_loads
 
 
-# Test database URL (use in-memory SQLite for tests)
-TEST_DATABASE_URL = "sqlite:///./test.db"
+# Test database URL (one in-memory SQLite database shared via StaticPool)
+TEST_DATABASE_URL = "sqlite://"
 
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a test database session."""
-    engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+@pytest.fixture(scope="session")
+def db_engine():
+    """Create the test engine and schema once per test session."""
+    engine = create_engine(
+        TEST_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        json_serializer=json_dumps_text,
+        json_deserializer=json_loads
+    )
+    
+    # pysqlite's own transaction handling breaks SAVEPOINTs; let
+    # SQLAlchemy emit BEGIN itself instead
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
     Base.metadata.create_all(bind=engine)
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def db_session(db_engine):
+    """
+    Create a test database session.
     
-    session = TestingSessionLocal()
+    The session runs inside an outer transaction that is rolled back after
+    the test; commits in the test only release a SAVEPOINT.
+    """
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    session = Session(
+        bind=connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint"
+    )
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture(scope="function")
@@ -51,3 +95,64 @@ def mock_user_id():
     """Mock user ID for testing."""
     return 1
 
+
+class FakeRedis:
+    """Minimal bytes-returning stand-in for the sync Redis client."""
+    
+    def __init__(self):
+        self.data = {}
+    
+    def setex(self, key, ttl, value):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+    
+    def get(self, key):
+        return self.data.get(key)
+    
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+    
+    def register_script(self, script):
+        return lambda keys, args: 1
+
+
+class FakePipeline:
+    """Pipeline stand-in that applies commands immediately."""
+    
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def set(self, *args, **kwargs):
+        self.redis_client.set(*args, **kwargs)
+    
+    def execute(self):
+        return []
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point cache_service at an in-memory Redis with the breaker closed."""
+    client = FakeRedis()
+    monkeypatch.setattr(cache.cache_service, "redis_client", client)
+    monkeypatch.setattr(cache.cache_service, "_open_until", 0.0)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_local_caches():
+    """Start every test with empty in-process caches."""
+    idempotency._local_cache.clear()
+    yield
+    idempotency._local_cache.clear()
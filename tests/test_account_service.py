@@ -0,0 +1,47 @@
+"""Tests for account service."""
+
+import pytest
+from sqlalchemy import event
+
+from src.services.account_service import AccountService
+from src.core.exceptions import InvalidCurrencyError
+from src.core.money import parse_money
+
+
+class TestAccountService:
+    """Test AccountService."""
+    
+    def test_create_account_rejects_unknown_currency(self, db_session):
+        """Test new accounts must use an ISO 4217 currency."""
+        with pytest.raises(InvalidCurrencyError):
+            AccountService(db_session).create_account(user_id=1, currency="XYZ")
+    
+    def test_get_accounts_by_ids(self, db_session):
+        """Test accounts are fetched in one query, ordered, skipping missing IDs."""
+        account_service = AccountService(db_session)
+        accounts = [
+            account_service.create_account(user_id=1, currency="USD", initial_balance=parse_money("10.00", "USD"))
+            for _ in range(3)
+        ]
+        db_session.commit()
+        ids = [account.account_id for account in accounts]
+        missing_id = max(ids) + 1
+        
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            found = account_service.get_accounts_by_ids([ids[2], missing_id, ids[0], ids[1], ids[0]])
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        
+        assert [account.account_id for account in found] == sorted(ids)
+        assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+    
+    def test_get_accounts_by_ids_empty(self, db_session):
+        """Test an empty ID list returns no accounts."""
+        assert AccountService(db_session).get_accounts_by_ids([]) == []
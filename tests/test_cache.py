@@ -0,0 +1,105 @@
+"""Tests for cache utilities."""
+
+from decimal import Decimal
+
+from src.services import cache
+from src.services.cache import LocalCache, invalidate_on_commit
+
+
+class TestInvalidateOnCommit:
+    """Test commit-time cache invalidation."""
+    
+    def test_keys_deleted_after_commit(self, db_session, monkeypatch):
+        """Test queued keys are deleted only once the session commits."""
+        deleted = []
+        monkeypatch.setattr(cache.cache_service, "delete_many", lambda keys: deleted.extend(keys))
+        
+        invalidate_on_commit(db_session, "balance:1", "account:1")
+        invalidate_on_commit(db_session, "balance:1")
+        assert deleted == []
+        
+        db_session.commit()
+        assert sorted(deleted) == ["account:1", "balance:1"]
+    
+    def test_keys_discarded_on_rollback(self, db_session, monkeypatch):
+        """Test a rolled back transaction invalidates nothing."""
+        deleted = []
+        monkeypatch.setattr(cache.cache_service, "delete_many", lambda keys: deleted.extend(keys))
+        
+        db_session.connection()
+        invalidate_on_commit(db_session, "balance:1")
+        db_session.rollback()
+        db_session.commit()
+        
+        assert deleted == []
+
+
+class TestCacheServiceJson:
+    """Test CacheService JSON helpers."""
+    
+    def test_json_round_trip(self, fake_redis):
+        """Test dicts round-trip with Decimals stored as strings."""
+        cache.cache_service.set_json("k", {"balance": Decimal("10.50"), "id": 1})
+        assert cache.cache_service.get_json("k") == {"balance": "10.50", "id": 1}
+    
+    def test_set_json_if_absent(self, fake_redis):
+        """Test SET NX keeps the first value written."""
+        assert cache.cache_service.set_json_if_absent("k", {"v": 1}) is True
+        assert cache.cache_service.set_json_if_absent("k", {"v": 2}) is False
+        assert cache.cache_service.get_json("k") == {"v": 1}
+    
+    def test_invalid_json_is_a_miss(self, fake_redis):
+        """Test a corrupt entry reads as a cache miss."""
+        fake_redis.data["k"] = b"{not json"
+        
+        assert cache.cache_service.get_json("k") is None
+
+
+class TestLocalCache:
+    """Test LocalCache."""
+    
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted when full."""
+        local = LocalCache(maxsize=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+        assert local.get("a") == 1
+        assert local.get("b") is None
+        assert local.get("c") == 3
+    
+    def test_entries_expire(self, monkeypatch):
+        """Test entries are dropped once their TTL has passed."""
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        local = LocalCache(maxsize=10, ttl=60)
+        local.set("a", 1)
+        now[0] += 61
+        assert local.get("a") is None
+
+
+class TestCircuitBreaker:
+    """Test the CacheService circuit breaker."""
+    
+    def test_error_skips_reads_until_cooldown(self, monkeypatch):
+        """Test a Redis error short-circuits reads for the cool-down."""
+        calls = []
+        
+        class _FailingRedis:
+            def get(self, key):
+                calls.append(key)
+                raise ConnectionError("down")
+        
+        now = [1000.0]
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(cache.cache_service, "redis_client", _FailingRedis())
+        monkeypatch.setattr(cache.cache_service, "_open_until", 0.0)
+        
+        assert cache.cache_service.get("k") is None
+        assert cache.cache_service.get("k") is None
+        assert calls == ["k"]
+        
+        now[0] += 60
+        assert cache.cache_service.get("k") is None
+        assert calls == ["k", "k"]
@@ -0,0 +1,72 @@
+"""Tests for API dependencies."""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from src.api.v1.dependencies import TokenCache, _peek_claims, _verify_token
+from src.core.config import settings
+
+
+def make_token(claims, key=None):
+    """Sign a JWT with the configured algorithm."""
+    return jwt.encode(claims, key or settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+class TestVerifyToken:
+    """Test JWT verification."""
+    
+    def test_valid_token(self):
+        """Test valid token returns the subject as user ID."""
+        exp = int(time.time()) + 60
+        user_id, token_exp = _verify_token(make_token({"sub": "42", "exp": exp}))
+        assert user_id == 42
+        assert token_exp == exp
+    
+    def test_expired_token_rejected_before_signature(self):
+        """Test expired token is rejected even with a bad signature."""
+        token = make_token({"sub": "42", "exp": int(time.time()) - 60}, key="wrong-key")
+        with pytest.raises(HTTPException) as exc_info:
+            _verify_token(token)
+        assert exc_info.value.detail == "Token expired"
+    
+    def test_bad_signature_rejected(self):
+        """Test token signed with another key is rejected."""
+        token = make_token({"sub": "42", "exp": int(time.time()) + 60}, key="wrong-key")
+        with pytest.raises(HTTPException) as exc_info:
+            _verify_token(token)
+        assert exc_info.value.status_code == 401
+    
+    def test_malformed_token_rejected(self):
+        """Test non-JWT token is rejected."""
+        with pytest.raises(HTTPException):
+            _peek_claims("not-a-jwt")
+
+
+class TestTokenCache:
+    """Test TokenCache."""
+    
+    def test_admitted_on_second_sighting(self):
+        """Test one-shot tokens are not cached."""
+        cache = TokenCache(maxsize=10)
+        
+        cache.put(b"key", 1, 100.0)
+        assert cache.get(b"key") is None
+        
+        cache.put(b"key", 1, 100.0)
+        assert cache.get(b"key") == (1, 100.0)
+    
+    def test_lru_eviction(self):
+        """Test least recently used token is evicted."""
+        cache = TokenCache(maxsize=2)
+        for key in (b"a", b"b", b"a", b"b"):
+            cache.put(key, 1, 100.0)
+        
+        cache.get(b"a")
+        cache.put(b"c", 1, 100.0)
+        cache.put(b"c", 1, 100.0)
+        
+        assert cache.get(b"a") is not None
+        assert cache.get(b"b") is None
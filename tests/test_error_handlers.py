@@ -0,0 +1,87 @@
+"""Tests for API error handlers."""
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.error_handlers import _error_body
+from src.api.v1.dependencies import get_current_user_id, get_payment_service
+from src.core.exceptions import (
+    DuplicateTransactionError,
+    InvalidAccountError,
+    TransactionLimitExceededError
+)
+from src.main import app
+
+
+class TestStatusMapping:
+    """Test exception to HTTP status mapping."""
+    
+    def test_mapped_exceptions(self):
+        """Test exceptions carry their status code."""
+        assert InvalidAccountError("missing").http_status == 404
+        assert DuplicateTransactionError("dup").http_status == 409
+    
+    def test_unmapped_exception_defaults_to_400(self):
+        """Test exceptions without an override fall back to 400."""
+        assert TransactionLimitExceededError("limit").http_status == 400
+    
+    def test_subclass_uses_base_status(self):
+        """Test subclasses inherit their base class status."""
+        class UnknownAccountError(InvalidAccountError):
+            pass
+        
+        assert UnknownAccountError("missing").http_status == 404
+
+
+class TestErrorBody:
+    """Test error body rendering."""
+    
+    def test_body_is_valid_json(self):
+        """Test dynamic fields are escaped."""
+        body = _error_body("InvalidAmountError", 'Bad "amount"\n', "/api/v1/transfers")
+        
+        assert orjson.loads(body) == {
+            "detail": 'Bad "amount"\n',
+            "error": "InvalidAmountError",
+            "path": "/api/v1/transfers"
+        }
+
+
+
+class _FailingPaymentService:
+    """PaymentService stand-in whose transfers raise a given error."""
+    
+    def __init__(self, error):
+        self.error = error
+    
+    def transfer_money(self, **kwargs):
+        raise self.error
+
+
+class TestTransferErrorResponses:
+    """Test payment errors as returned by the transfer endpoint."""
+    
+    @pytest.mark.parametrize("error, status_code", [
+        (InvalidAccountError("Account 1001 not found"), 404),
+        (DuplicateTransactionError("Transaction already processed: 5001"), 409),
+    ])
+    def test_error_body_matches_documented_shape(self, error, status_code):
+        """Test the body carries the message under "detail"."""
+        app.dependency_overrides[get_payment_service] = lambda: _FailingPaymentService(error)
+        app.dependency_overrides[get_current_user_id] = lambda: 1
+        try:
+            # No context manager: the lifespan needs Redis
+            response = TestClient(app, raise_server_exceptions=False).post(
+                "/api/v1/transfers",
+                json={"from_account_id": 1001, "to_account_id": 1002, "amount": "10.00", "currency": "USD"}
+            )
+        finally:
+            app.dependency_overrides.clear()
+        
+        assert response.status_code == status_code
+        assert response.json() == {
+            "detail": str(error),
+            "error": type(error).__name__,
+            "path": "/api/v1/transfers"
+        }
@@ -1,8 +1,14 @@
 """Tests for idempotency."""
 
+from datetime import datetime, timedelta
+
 import pytest
+from src.db.models import IdempotencyKey
+from src.services import idempotency
 from src.services.idempotency import IdempotencyService
+from src.core.config import settings
 from src.core.money import parse_money
+from src.utils.json_serialization import json_loads
 
 
 class TestIdempotencyService:
@@ -36,6 +42,63 @@ class TestIdempotencyService:
         cached = service.check_idempotency("non-existent-key")
         assert cached is None
     
+    def test_expired_idempotency_key_ignored(self, db_session):
+        """Test keys past expires_at are treated as absent."""
+        db_session.add(IdempotencyKey(
+            idempotency_key="test-key-expired",
+            transaction_id=None,
+            response_data={"status": "COMPLETED"},
+            expires_at=datetime.utcnow() - timedelta(seconds=1)
+        ))
+        db_session.commit()
+        
+        assert IdempotencyService(db_session).check_idempotency("test-key-expired") is None
+    
+    def test_miss_cached_until_response_stored(self, db_session, fake_redis):
+        """Test a miss is remembered, then replaced by the stored response."""
+        service = IdempotencyService(db_session)
+        
+        assert service.check_idempotency("test-key-miss") is None
+        
+        # Recorded in the database but not yet cached: the miss still holds
+        db_session.add(IdempotencyKey(
+            idempotency_key="test-key-miss",
+            transaction_id=None,
+            response_data={"status": "COMPLETED"},
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        ))
+        db_session.commit()
+        assert service.check_idempotency("test-key-miss") is None
+        
+        service._pending_cache.append(("idempotency:test-key-miss", {"status": "COMPLETED"}))
+        service.warm_cache()
+        assert json_loads(fake_redis.get("idempotency:test-key-miss")) == {"status": "COMPLETED"}
+        assert service.check_idempotency("test-key-miss") == {"status": "COMPLETED"}
+    
+    def test_authoritative_cache_miss_skips_database(self, db_session, fake_redis, monkeypatch):
+        """Test a Redis miss is final when the cache is authoritative."""
+        monkeypatch.setattr(
+            idempotency, "settings",
+            settings.model_copy(update={"IDEMPOTENCY_CACHE_AUTHORITATIVE": True})
+        )
+        db_session.add(IdempotencyKey(
+            idempotency_key="test-key-authoritative",
+            transaction_id=None,
+            response_data={"status": "COMPLETED"},
+            expires_at=datetime.utcnow() + timedelta(hours=1)
+        ))
+        db_session.commit()
+        
+        assert IdempotencyService(db_session).check_idempotency("test-key-authoritative") is None
+    
+    def test_request_hash_is_canonical(self):
+        """Test the request hash ignores key order and fits the column."""
+        first = IdempotencyService.generate_request_hash({"amount": "1.00", "currency": "USD"})
+        second = IdempotencyService.generate_request_hash({"currency": "USD", "amount": "1.00"})
+        assert first == second
+        assert len(first) == 32
+        assert first != IdempotencyService.generate_request_hash({"amount": "2.00", "currency": "USD"})
+    
     def test_duplicate_transaction_prevention(self, db_session):
         """Test that duplicate transactions are prevented."""
         from src.services.payment_service import PaymentService
@@ -0,0 +1,48 @@
+"""Tests for ID generation."""
+
+import pytest
+import redis
+
+from src.services import cache
+from src.utils.ids import SnowflakeGenerator
+
+
+class TestSnowflakeGenerator:
+    """Test SnowflakeGenerator."""
+    
+    def test_ids_unique_and_increasing(self):
+        """Test IDs strictly increase, including within one millisecond."""
+        generator = SnowflakeGenerator(worker_id=1)
+        ids = [generator.next_id() for _ in range(10000)]
+        assert ids == sorted(set(ids))
+        assert all(0 < i < 2 ** 63 for i in ids)
+    
+    def test_worker_id_encoded(self):
+        """Test the worker ID occupies bits 12-21."""
+        generator = SnowflakeGenerator(worker_id=5)
+        assert (generator.next_id() >> 12) & 0x3FF == 5
+    
+    def test_worker_id_out_of_range(self):
+        """Test invalid worker IDs are rejected."""
+        with pytest.raises(ValueError):
+            SnowflakeGenerator(worker_id=1024)
+    
+    def test_leased_worker_ids_unique(self, fake_redis):
+        """Test generators without a fixed ID lease distinct worker IDs."""
+        first = SnowflakeGenerator()
+        second = SnowflakeGenerator()
+        
+        assert first.worker_id != second.worker_id
+        assert fake_redis.get(f"snowflake:worker:{first.worker_id}") is not None
+        assert (first.next_id() >> 12) & 0x3FF == first.worker_id
+    
+    def test_lease_fails_without_redis(self, monkeypatch):
+        """Test IDs aren't generated when no worker ID can be leased."""
+        class _DownRedis:
+            def set(self, *args, **kwargs):
+                raise redis.ConnectionError("down")
+        
+        monkeypatch.setattr(cache.cache_service, "redis_client", _DownRedis())
+        
+        with pytest.raises(RuntimeError):
+            SnowflakeGenerator().next_id()
@@ -0,0 +1,29 @@
+"""Tests for application wiring."""
+
+import pytest
+from fastapi import FastAPI
+
+from src.main import app, check_unique_routes
+
+
+class TestCheckUniqueRoutes:
+    """Test check_unique_routes."""
+    
+    def test_app_routes_are_unique(self):
+        """Test the application registers each path and method once."""
+        check_unique_routes(app)
+    
+    def test_same_path_different_methods_allowed(self):
+        """Test GET and POST on one path are not duplicates."""
+        test_app = FastAPI()
+        test_app.get("/items")(lambda: None)
+        test_app.post("/items")(lambda: None)
+        check_unique_routes(test_app)
+    
+    def test_duplicate_route_raises(self):
+        """Test a path and method registered twice is rejected."""
+        test_app = FastAPI()
+        test_app.get("/items")(lambda: None)
+        test_app.get("/items")(lambda: None)
+        with pytest.raises(RuntimeError, match="GET /items"):
+            check_unique_routes(test_app)
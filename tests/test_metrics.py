@@ -0,0 +1,45 @@
+"""Tests for metrics utilities."""
+
+import pytest
+from prometheus_client import Counter, Histogram
+
+from src.utils.metrics import measure_time, metric_aggregator
+
+
+class TestMetricAggregator:
+    """Test per-request counter buffering."""
+    
+    def test_increments_applied_on_flush(self):
+        """Test buffered increments reach the counter only when flushed."""
+        counter = Counter("test_buffered_total", "Test counter", registry=None)
+        
+        token = metric_aggregator.start()
+        metric_aggregator.incr(counter)
+        metric_aggregator.incr(counter, 2)
+        assert counter._value.get() == 0
+        
+        metric_aggregator.flush(token)
+        assert counter._value.get() == 3
+    
+    def test_increments_applied_directly_outside_request(self):
+        """Test increments without an active buffer are not deferred."""
+        counter = Counter("test_direct_total", "Test counter", registry=None)
+        
+        metric_aggregator.incr(counter)
+        assert counter._value.get() == 1
+
+
+class TestMeasureTime:
+    """Test measure_time decorator."""
+    
+    def test_duration_observed_even_on_error(self):
+        """Test the histogram records calls that raise."""
+        histogram = Histogram("test_duration_seconds", "Test histogram", registry=None)
+        
+        @measure_time(histogram)
+        def fail():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError):
+            fail()
+        assert histogram._sum.get() > 0
@@ -0,0 +1,90 @@
+"""Tests for API middleware."""
+
+from src.api.middleware import AdmissionFilter, LoggingMiddleware, get_client_ip
+
+
+class TestAdmissionFilter:
+    """Test AdmissionFilter."""
+    
+    def test_client_becomes_hot_above_threshold(self):
+        """Test client is cold until it exceeds the threshold."""
+        admission = AdmissionFilter(threshold=3)
+        
+        results = [admission.record("10.0.0.1", now=1000.0) for _ in range(4)]
+        assert results == [False, False, False, True]
+    
+    def test_hits_expire_after_window(self):
+        """Test old buckets stop counting towards the threshold."""
+        admission = AdmissionFilter(threshold=2, window_minutes=5)
+        
+        for _ in range(3):
+            admission.record("10.0.0.1", now=0.0)
+        assert admission.record("10.0.0.1", now=60.0)
+        
+        # Six minutes later the earlier hits are outside the window
+        assert not admission.record("10.0.0.1", now=360.0)
+    
+    def test_clients_tracked_independently(self):
+        """Test hits from one client don't warm up another."""
+        admission = AdmissionFilter(threshold=1)
+        
+        admission.record("10.0.0.1", now=0.0)
+        assert admission.record("10.0.0.1", now=0.0)
+        assert not admission.record("10.0.0.2", now=0.0)
+    
+    def test_stale_clients_evicted_when_full(self):
+        """Test the client table stays bounded."""
+        admission = AdmissionFilter(threshold=1, window_minutes=1, max_clients=2)
+        
+        admission.record("10.0.0.1", now=0.0)
+        admission.record("10.0.0.2", now=0.0)
+        admission.record("10.0.0.3", now=120.0)
+        
+        assert len(admission._buckets) == 1
+
+
+class TestGetClientIp:
+    """Test client IP resolution."""
+    
+    PROXY = frozenset({"10.0.0.1"})
+    
+    def _scope(self, peer, headers=()):
+        """Build a minimal ASGI scope."""
+        return {"client": (peer, 12345), "headers": list(headers)}
+    
+    def test_untrusted_peer_headers_ignored(self):
+        """Test forwarding headers from an untrusted peer are not trusted."""
+        scope = self._scope("203.0.113.5", [(b"x-forwarded-for", b"1.2.3.4")])
+        assert get_client_ip(scope, self.PROXY) == "203.0.113.5"
+    
+    def test_forwarded_for_rightmost_untrusted_hop(self):
+        """Test spoofed leftmost XFF entries are skipped."""
+        scope = self._scope("10.0.0.1", [(b"x-forwarded-for", b"6.6.6.6, 198.51.100.7, 10.0.0.1")])
+        assert get_client_ip(scope, self.PROXY) == "198.51.100.7"
+    
+    def test_cf_connecting_ip_preferred(self):
+        """Test CF-Connecting-IP wins over X-Forwarded-For."""
+        scope = self._scope("10.0.0.1", [
+            (b"x-forwarded-for", b"198.51.100.7"),
+            (b"cf-connecting-ip", b"192.0.2.9"),
+        ])
+        assert get_client_ip(scope, self.PROXY) == "192.0.2.9"
+    
+    def test_trusted_peer_without_headers(self):
+        """Test a trusted peer with no forwarding headers is used as-is."""
+        assert get_client_ip(self._scope("10.0.0.1"), self.PROXY) == "10.0.0.1"
+
+
+class TestLoggingMiddleware:
+    """Test LoggingMiddleware sampling."""
+    
+    def test_errors_and_slow_requests_always_logged(self):
+        """Test sampling never drops errors or slow requests."""
+        middleware = LoggingMiddleware(app=None)
+        middleware.sample_rate = 0.0
+        
+        assert middleware._should_log(500, 0.001)
+        assert middleware._should_log(404, 0.001)
+        assert middleware._should_log(200, middleware.slow_seconds + 1)
+        assert not middleware._should_log(200, 0.001)
+
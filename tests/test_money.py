@@ -3,7 +3,7 @@
 import pytest
 from decimal import Decimal
 
-from src.core.money import Money, parse_money, zero_money
+from src.core.money import Money, is_iso4217, parse_money, sum_money, zero_money
 
 
 class TestMoney:
@@ -42,6 +42,22 @@ class TestMoney:
         with pytest.raises(ValueError):
             _ = m1 - m2
     
+    def test_multiplication_by_negative(self):
+        """Test multiplying by a negative number raises error."""
+        with pytest.raises(ValueError):
+            _ = Money("10.00", "USD") * -2
+    
+    def test_multiplication(self):
+        """Test multiplying by int and Decimal, and rejecting float."""
+        money = Money("10.00", "USD")
+        assert (money * 3).amount == Decimal("30.00")
+        assert (money * Decimal("0.015")).amount == Decimal("0.15000")
+        assert (money / 4).amount == Decimal("2.50")
+        with pytest.raises(TypeError):
+            _ = money * 1.5
+        with pytest.raises(TypeError):
+            _ = money / 2.0
+    
     def test_currency_mismatch(self):
         """Test currency mismatch raises error."""
         m1 = Money("100.00", "USD")
@@ -49,6 +65,19 @@ class TestMoney:
         with pytest.raises(ValueError):
             _ = m1 + m2
     
+    def test_currency_normalised(self):
+        """Test currency codes are upper-cased to one shared instance."""
+        assert Money("1.00", "usd").currency is Money("2.00", "USD").currency
+    
+    def test_non_iso_currency_accepted(self):
+        """Test codes outside ISO 4217 (e.g. on old accounts) still work."""
+        assert Money("1.00", "hrk").currency is Money("2.00", "HRK").currency
+    
+    def test_iso4217_codes(self):
+        """Test ISO 4217 validation, including fund and metal codes."""
+        assert all(is_iso4217(code) for code in ["usd", "VED", "XAU", "XDR", "CLF", "BOV", "UYW"])
+        assert not is_iso4217("XYZ")
+    
     def test_comparison(self):
         """Test Money comparison."""
         m1 = Money("100.00", "USD")
@@ -76,6 +105,47 @@ class TestMoney:
         quantized = money.quantize(2)
         assert quantized.amount == Decimal("100.56")  # Rounded up
     
+    def test_quantize_exponent(self):
+        """Test quantize keeps the requested exponent, including uncached ones."""
+        money = Money("100.5", "USD")
+        assert str(money.quantize(0).amount) == "101"
+        assert str(money.quantize(2).amount) == "100.50"
+        assert str(money.quantize(12).amount) == "100.500000000000"
+    
+    def test_hash_consistent_with_equality(self):
+        """Test equal Money values hash equally."""
+        assert hash(Money("1.0", "USD")) == hash(Money("1.00", "usd"))
+        assert len({Money("1.0", "USD"), Money("1.00", "USD")}) == 1
+    
+    def test_no_instance_dict(self):
+        """Test Money uses slots rather than a per-instance dict."""
+        with pytest.raises(AttributeError):
+            Money("1.00", "USD").note = "x"
+    
+    def test_minor_units_round_trip(self):
+        """Test conversion to and from integer minor units."""
+        money = Money.from_minor(10050, "usd")
+        assert money.amount == Decimal("100.50")
+        assert money.currency == "USD"
+        assert money.minor == 10050
+        assert Money("100.5", "USD").minor == 10050
+    
+    def test_minor_units_reject_fractional_cents(self):
+        """Test sub-cent amounts can't be expressed in minor units."""
+        with pytest.raises(ValueError):
+            _ = Money("100.555", "USD").minor
+    
+    def test_sum_money(self):
+        """Test summing many amounts of one currency."""
+        total = sum_money((Money("0.10", "USD") for _ in range(1000)), "USD")
+        assert total == Money("100.00", "USD")
+        assert sum_money([], "EUR") == zero_money("EUR")
+    
+    def test_sum_money_currency_mismatch(self):
+        """Test summing mixed currencies raises error."""
+        with pytest.raises(ValueError):
+            sum_money([Money("1.00", "USD"), Money("1.00", "EUR")], "USD")
+    
     def test_no_float_precision_errors(self):
         """Test that we don't have float precision errors."""
         # This would fail with floats: 0.1 + 0.2 = 0.30000000000000004
@@ -0,0 +1,24 @@
+"""Tests for pagination cursors."""
+
+from datetime import datetime
+
+import pytest
+
+from src.utils.pagination import decode_cursor, encode_cursor
+
+
+class TestCursor:
+    """Test cursor encoding."""
+    
+    def test_round_trip(self):
+        """Test a cursor decodes to the position it encodes."""
+        created_at = datetime(2024, 1, 15, 10, 30, 0, 123456)
+        
+        cursor = encode_cursor(created_at, 5001)
+        assert decode_cursor(cursor) == (created_at, 5001)
+    
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "WzEsMl0", "WyJ4IiwxXQ"])
+    def test_malformed_cursor_rejected(self, cursor):
+        """Test malformed cursors raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
@@ -12,7 +12,9 @@ from src.core.exceptions import (
     InvalidAmountError,
     CurrencyMismatchError
 )
-from src.db.models import AccountStatus
+from src.db.models import (
+    AccountStatus, AuditLog, EntryType, Transaction, TransactionEntry, TransactionStatus, TransactionType
+)
 
 
 class TestPaymentService:
@@ -45,6 +47,37 @@ class TestPaymentService:
         assert account2.balance == Decimal("80.00")
         assert transaction.status.value == "COMPLETED"
     
+    def test_transfer_persists_balances_entries_and_audit(self, db_session):
+        """Test a transfer's writes as stored in the database."""
+        account_service = AccountService(db_session)
+        payment_service = PaymentService(db_session)
+        
+        account1 = account_service.create_account(user_id=1, currency="USD", initial_balance=parse_money("100.00", "USD"))
+        account2 = account_service.create_account(user_id=1, currency="USD", initial_balance=parse_money("50.00", "USD"))
+        db_session.commit()
+        
+        transaction = payment_service.transfer_money(
+            from_account_id=account1.account_id,
+            to_account_id=account2.account_id,
+            amount=parse_money("30.00", "USD"),
+            idempotency_key="test-key-persist"
+        )
+        db_session.commit()
+        db_session.expire_all()
+        
+        assert account_service.get_account(account1.account_id).balance == Decimal("70.00")
+        assert account_service.get_account(account2.account_id).balance == Decimal("80.00")
+        assert account_service.get_account(account1.account_id).version == 1
+        
+        entries = db_session.query(TransactionEntry).filter_by(transaction_id=transaction.transaction_id).all()
+        assert sorted((e.account_id, e.entry_type) for e in entries) == sorted([
+            (account1.account_id, EntryType.DEBIT),
+            (account2.account_id, EntryType.CREDIT),
+        ])
+        
+        debit = db_session.query(AuditLog).filter_by(action="TRANSFER_DEBIT").one()
+        assert (debit.old_balance, debit.new_balance) == (Decimal("100.00"), Decimal("70.00"))
+    
     def test_transfer_insufficient_funds(self, db_session):
         """Test transfer with insufficient funds."""
         account_service = AccountService(db_session)
@@ -116,4 +149,57 @@ class TestPaymentService:
                 amount=parse_money("0.00", "USD"),
                 idempotency_key="test-key-5"
             )
-
+    
+    def test_account_transactions_paginate_both_directions(self, db_session):
+        """Test history merges incoming and outgoing transfers, newest first."""
+        account_service = AccountService(db_session)
+        payment_service = PaymentService(db_session)
+        
+        account1 = account_service.create_account(user_id=1, currency="USD", initial_balance=parse_money("100.00", "USD"))
+        account2 = account_service.create_account(user_id=1, currency="USD", initial_balance=parse_money("50.00", "USD"))
+        db_session.commit()
+        
+        transaction_ids = []
+        for i, (from_id, to_id) in enumerate([
+            (account1.account_id, account2.account_id),
+            (account2.account_id, account1.account_id),
+            (account1.account_id, account2.account_id),
+        ]):
+            transaction = payment_service.transfer_money(
+                from_account_id=from_id,
+                to_account_id=to_id,
+                amount=parse_money("10.00", "USD"),
+                idempotency_key=f"test-key-history-{i}"
+            )
+            db_session.commit()
+            transaction_ids.append(transaction.transaction_id)
+        
+        page, has_more = payment_service.get_account_transactions(account1.account_id, limit=2)
+        assert [t.transaction_id for t in page] == transaction_ids[:0:-1]
+        assert has_more
+        
+        page, has_more = payment_service.get_account_transactions(account1.account_id, limit=3)
+        assert [t.transaction_id for t in page] == transaction_ids[::-1]
+        assert not has_more
+    
+    def test_account_transactions_include_deposits(self, db_session):
+        """Test transactions with no source account appear in history."""
+        account_service = AccountService(db_session)
+        payment_service = PaymentService(db_session)
+        
+        account = account_service.create_account(user_id=1, currency="USD")
+        deposit = Transaction(
+            from_account_id=None,
+            to_account_id=account.account_id,
+            amount=Decimal("25.00"),
+            currency="USD",
+            transaction_type=TransactionType.DEPOSIT,
+            status=TransactionStatus.COMPLETED,
+            idempotency_key="test-key-deposit"
+        )
+        db_session.add(deposit)
+        db_session.commit()
+        
+        page, has_more = payment_service.get_account_transactions(account.account_id)
+        assert [t.transaction_id for t in page] == [deposit.transaction_id]
+        assert not has_more
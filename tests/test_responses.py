@@ -0,0 +1,22 @@
+"""Tests for API response rendering."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import orjson
+
+from src.api.responses import ORJSONResponse
+
+
+class TestORJSONResponse:
+    """Test ORJSONResponse."""
+    
+    def test_naive_datetime_rendered_as_utc(self):
+        """Test naive datetimes are rendered as UTC with a Z suffix."""
+        response = ORJSONResponse({"created_at": datetime(2024, 1, 15, 10, 30, 0)})
+        assert orjson.loads(response.body) == {"created_at": "2024-01-15T10:30:00Z"}
+    
+    def test_decimal_rendered_as_string(self):
+        """Test Decimal falls back to its exact string form."""
+        response = ORJSONResponse({"amount": Decimal("250.00")})
+        assert orjson.loads(response.body) == {"amount": "250.00"}